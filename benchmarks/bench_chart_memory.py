@@ -0,0 +1,53 @@
+import gc
+import resource
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import matplotlib  # noqa: E402
+
+matplotlib.use("Agg")
+matplotlib.rcParams["figure.max_open_warning"] = 0
+
+import matplotlib.pyplot as plt  # noqa: E402
+
+from feed_planner import CUSTOM_INGREDIENTS, feed_mix_png  # noqa: E402
+
+RERUNS = 1000
+REPORT_EVERY = 200
+
+
+def current_rss_mb():
+    # Resident set size now, not the peak that getrusage reports.
+    with open("/proc/self/statm") as statm:
+        pages = int(statm.read().split()[1])
+    return pages * resource.getpagesize() / 2**20
+
+
+def pyplot_feed_mix(totals):
+    # The old app chart: a new pyplot figure per rerun that is never closed.
+    fig, ax = plt.subplots(figsize=(8, 4.5))
+    ax.bar([ingredient for ingredient, _ in totals], [kg for _, kg in totals], color="#3f7d58")
+    fig.tight_layout()
+    return fig
+
+
+def run(label, render):
+    # Every rerun gets different totals, so no cache could hide a leak.
+    print(label)
+    for rerun in range(1, RERUNS + 1):
+        totals = [(ingredient, 100.0 + rerun + index) for index, ingredient in enumerate(CUSTOM_INGREDIENTS[:8])]
+        render(totals)
+        if rerun % REPORT_EVERY == 0:
+            gc.collect()
+            print(f"  rerun {rerun:>5}  rss {current_rss_mb():7.1f} MB  open pyplot figures {len(plt.get_fignums())}")
+
+
+def main():
+    run("feed_mix_png (no pyplot, figure freed)", feed_mix_png)
+    run("pyplot figure per rerun, never closed", pyplot_feed_mix)
+
+
+if __name__ == "__main__":
+    main()
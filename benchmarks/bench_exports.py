@@ -0,0 +1,58 @@
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from feed_planner import (  # noqa: E402
+    CUSTOM_INGREDIENTS,
+    LIVESTOCK_DATA,
+    TABLE_FORMATS,
+    build_farm_plan,
+    dataframe_to_excel,
+    plan_sheets,
+    write_table,
+)
+
+GROUPS = 10000
+RUNS = 3
+
+
+def timed(write):
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        size = write()
+        timings.append(time.perf_counter() - started)
+    return min(timings), size
+
+
+def main():
+    pairs = [(animal, stage) for animal, data in LIVESTOCK_DATA.items() for stage in data["stages"]]
+    groups = [
+        {"name": f"Group {number}", "animal": pairs[number % len(pairs)][0],
+         "stage": pairs[number % len(pairs)][1], "count": 20 + number % 400, "days": 30}
+        for number in range(GROUPS)
+    ]
+    sheets = plan_sheets(build_farm_plan(groups, {ingredient: 400.0 for ingredient in CUSTOM_INGREDIENTS}, 50))
+    rows = sum(len(dataframe) for dataframe in sheets.values())
+    print(f"{GROUPS:,} groups, {rows:,} rows over {len(sheets)} sheets")
+
+    elapsed, size = timed(lambda: len(dataframe_to_excel(sheets)))
+    print(f"{'xlsx':<8} {elapsed:7.2f} s {size / 2**20:8.2f} MB")
+
+    for table_format in TABLE_FORMATS:
+        def write():
+            size = 0
+            for dataframe in sheets.values():
+                output = BytesIO()
+                write_table(dataframe, table_format, output)
+                size += output.tell()
+            return size
+        elapsed, size = timed(write)
+        print(f"{table_format:<8} {elapsed:7.2f} s {size / 2**20:8.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
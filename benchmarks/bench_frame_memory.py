@@ -0,0 +1,54 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd  # noqa: E402
+
+from feed_planner import CUSTOM_INGREDIENTS, LIVESTOCK_DATA, build_farm_plan, summarize_ingredients  # noqa: E402
+
+GROUPS = 10000
+RUNS = 5
+
+
+def as_plain(dataframe):
+    # The frames as they were before categoricals: Python strings in object
+    # columns and int64 counts.
+    return dataframe.astype({
+        column: object if isinstance(dtype, pd.CategoricalDtype) else "int64"
+        for column, dtype in dataframe.dtypes.items()
+        if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_integer_dtype(dtype)
+    })
+
+
+def best_time(call):
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    pairs = [(animal, stage) for animal, data in LIVESTOCK_DATA.items() for stage in data["stages"]]
+    groups = [
+        {"name": f"Group {number}", "animal": pairs[number % len(pairs)][0],
+         "stage": pairs[number % len(pairs)][1], "count": 20 + number % 400, "days": 30}
+        for number in range(GROUPS)
+    ]
+    plan = build_farm_plan(groups, {ingredient: 400.0 for ingredient in CUSTOM_INGREDIENTS}, 50)
+    print(f"{GROUPS:,} groups")
+    for name in ("feed", "schedule", "groups"):
+        compact = plan[name].memory_usage(deep=True).sum() / 2**20
+        plain = as_plain(plan[name]).memory_usage(deep=True).sum() / 2**20
+        print(f"{name:<9} {len(plan[name]):>8,} rows  {plain:7.2f} MB plain  {compact:7.2f} MB compact")
+
+    plain_feed = as_plain(plan["feed"])
+    print(f"shopping list groupby  {best_time(lambda: summarize_ingredients(plain_feed)) * 1000:7.2f} ms plain  "
+          f"{best_time(lambda: summarize_ingredients(plan['feed'])) * 1000:7.2f} ms compact")
+
+
+if __name__ == "__main__":
+    main()
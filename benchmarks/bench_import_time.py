@@ -0,0 +1,45 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+RUNS = 5
+
+# What importing chicken_feed_app used to pull in before the planning core
+# was split out, against the planning core on its own.
+CASES = {
+    "app imports (streamlit, pyplot, reportlab, pycountry, pandas)": (
+        "import streamlit, matplotlib.pyplot, pycountry, pandas; "
+        "from reportlab.lib.pagesizes import letter; from reportlab.pdfgen import canvas"
+    ),
+    "import feed_planner": "import feed_planner",
+}
+HEAVY_MODULES = ("streamlit", "matplotlib", "reportlab", "pycountry", "xlsxwriter")
+
+
+def cold_import_seconds(statement):
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def loaded_heavy_modules(statement):
+    probe = f"{statement}; import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, check=True, capture_output=True, text=True)
+    return result.stdout.strip() or "none"
+
+
+def main():
+    baseline = cold_import_seconds("pass")
+    print(f"{'interpreter start':<64} {baseline * 1000:8.1f} ms")
+    for label, statement in CASES.items():
+        elapsed = cold_import_seconds(statement)
+        print(f"{label:<64} {elapsed * 1000:8.1f} ms  heavy modules: {loaded_heavy_modules(statement)}")
+
+
+if __name__ == "__main__":
+    main()
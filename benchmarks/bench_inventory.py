@@ -0,0 +1,79 @@
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from feed_planner import CUSTOM_INGREDIENTS, record_stock_event, stock_status, storage  # noqa: E402
+from feed_planner.inventory import apply_stock_event  # noqa: E402
+
+FARMS = 200
+YEARS = 3
+INGREDIENTS = CUSTOM_INGREDIENTS[:6]
+DAILY_KG = 40.0
+RECORDS = 500
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        db = storage.connect(str(Path(folder) / "stock.sqlite3"))
+        first_day = date.today() - timedelta(days=365 * YEARS)
+        # Weekly deliveries and a monthly stock count for every farm and
+        # ingredient, loaded straight into the tables.
+        days = [(first_day + timedelta(days=day)).isoformat() for day in range(0, 365 * YEARS, 7)]
+        farms = [storage.farm_id(db, f"Farm {farm}") for farm in range(FARMS)]
+        with db:
+            db.executemany(
+                "INSERT INTO stock_events (farm_id, ingredient, day, kind, kg) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (farm, ingredient, day, "count" if number % 4 == 0 else "delivery", 300.0)
+                    for farm in farms for ingredient in INGREDIENTS for number, day in enumerate(days)
+                ),
+            )
+            db.executemany(
+                "INSERT INTO stock_levels (farm_id, ingredient, day, kg) VALUES (?, ?, ?, ?)",
+                ((farm, ingredient, days[-1], 300.0) for farm in farms for ingredient in INGREDIENTS),
+            )
+        events = db.execute("SELECT COUNT(*) FROM stock_events").fetchone()[0]
+        print(f"{events:,} stock events for {FARMS} farms over {YEARS} years")
+
+        today = date.today().isoformat()
+        started = time.perf_counter()
+        for number in range(RECORDS):
+            record_stock_event(
+                db, f"Farm {number % FARMS}",
+                {"ingredient": INGREDIENTS[number % len(INGREDIENTS)], "day": today, "kind": "delivery", "kg": 500},
+                DAILY_KG,
+            )
+        elapsed = time.perf_counter() - started
+        print(f"record a delivery (incremental):  {elapsed / RECORDS * 1000:8.2f} ms")
+
+        started = time.perf_counter()
+        for number in range(RECORDS):
+            record_stock_event(
+                db, f"Farm {number % FARMS}",
+                {"ingredient": INGREDIENTS[number % len(INGREDIENTS)], "day": days[-3], "kind": "delivery", "kg": 500},
+                DAILY_KG,
+            )
+        elapsed = time.perf_counter() - started
+        print(f"record a backdated delivery:      {elapsed / RECORDS * 1000:8.2f} ms")
+
+        started = time.perf_counter()
+        for number in range(RECORDS // 10):
+            level = None
+            for event in storage.load_stock_events(db, f"Farm {number % FARMS}", INGREDIENTS[number % len(INGREDIENTS)]):
+                level = apply_stock_event(level, event, DAILY_KG)
+        elapsed = time.perf_counter() - started
+        print(f"replay one ingredient's history:  {elapsed / (RECORDS // 10) * 1000:8.2f} ms")
+
+        started = time.perf_counter()
+        for number in range(RECORDS):
+            stock_status(storage.load_stock_levels(db, f"Farm {number % FARMS}"), dict.fromkeys(INGREDIENTS, DAILY_KG))
+        elapsed = time.perf_counter() - started
+        print(f"stock status for one farm:        {elapsed / RECORDS * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
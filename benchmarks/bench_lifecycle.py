@@ -0,0 +1,35 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from feed_planner import LIFECYCLE, simulate_lifecycle  # noqa: E402
+
+RUNS = 5
+
+
+def main():
+    animals = list(LIFECYCLE)
+    cases = {
+        "500 cattle groups x 540 days": [
+            {"name": f"Herd {i}", "animal": "Cattle", "count": 20 + i % 80, "days_to_sale": 540}
+            for i in range(500)
+        ],
+        "500 mixed groups, mixed days to sale": [
+            {"name": f"Group {i}", "animal": animals[i % len(animals)], "count": 20 + i % 80,
+             "days_to_sale": LIFECYCLE[animals[i % len(animals)]]["days_to_sale"] + i % 30}
+            for i in range(500)
+        ],
+    }
+    for label, groups in cases.items():
+        timings = []
+        for _ in range(RUNS):
+            started = time.perf_counter()
+            simulate_lifecycle(groups)
+            timings.append(time.perf_counter() - started)
+        print(f"{label:<40} {min(timings) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
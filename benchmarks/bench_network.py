@@ -0,0 +1,41 @@
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from feed_planner import CUSTOM_INGREDIENTS, LIVESTOCK_DATA, plan_network  # noqa: E402
+
+FARMS = 5000
+GROUPS_PER_FARM = 5
+REGIONS = 12
+
+
+def main():
+    random.seed(0)
+    pairs = [(animal, stage) for animal, data in LIVESTOCK_DATA.items() for stage in data["stages"]]
+    farm_groups = {
+        f"Farm {farm}": [
+            {"name": f"Group {number}", "animal": animal, "stage": stage,
+             "count": random.randint(10, 500), "days": 30, "ration": None}
+            for number, (animal, stage) in enumerate(random.sample(pairs, GROUPS_PER_FARM))
+        ]
+        for farm in range(FARMS)
+    }
+    regions = {farm: f"Region {index % REGIONS}" for index, farm in enumerate(farm_groups)}
+    prices = {ingredient: 400.0 for ingredient in CUSTOM_INGREDIENTS}
+
+    for workers in sorted({1, os.cpu_count() or 1}):
+        started = time.perf_counter()
+        network = plan_network(farm_groups, prices, 50, regions, workers=workers)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{FARMS} farms x {GROUPS_PER_FARM} groups, {workers} worker(s): {elapsed:6.2f} s "
+            f"({len(network['feed']):,} feed rows, {len(network['regions'])} regional order lines)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from feed_planner import (  # noqa: E402
+    LIVESTOCK_DATA,
+    add_costs,
+    calculate_farm_plan,
+    generate_pdf_report,
+)
+
+
+def make_groups(count):
+    stages = [
+        (animal, stage)
+        for animal, animal_data in LIVESTOCK_DATA.items()
+        for stage in animal_data["stages"]
+    ]
+    return [
+        {
+            "name": f"Barn {i // 10 + 1} pen {i % 10 + 1}",
+            "animal": stages[i % len(stages)][0],
+            "stage": stages[i % len(stages)][1],
+            "count": 50 + i % 200,
+            "days": 30,
+            "ration": None,
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    for group_count in (10, 100, 1250):
+        feed_df, schedule_df, _ = calculate_farm_plan(make_groups(group_count))
+        feed_df = add_costs(feed_df, {"corn": 450.0, "soybean meal": 900.0}, 50.0)
+        lines = len(feed_df) + len(schedule_df)
+
+        started = time.perf_counter()
+        report = generate_pdf_report(feed_df, schedule_df, "ZMW", feed_df["Plan cost"].sum())
+        elapsed = time.perf_counter() - started
+
+        size_kb = len(report.getvalue()) / 1024
+        print(f"{group_count:>6} groups  {lines:>6} lines  {elapsed * 1000:8.1f} ms  {size_kb:8.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
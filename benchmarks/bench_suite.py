@@ -0,0 +1,155 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from feed_planner import (  # noqa: E402
+    CUSTOM_INGREDIENTS,
+    LIVESTOCK_DATA,
+    add_costs,
+    build_farm_plan,
+    build_schedule,
+    calculate_group_plan,
+    dataframe_to_excel,
+    feed_mix_png,
+    generate_pdf_report,
+    ingredient_totals,
+    merge_ingredient_summaries,
+    normalize_ration,
+    plan_sheets,
+    procurement_plan,
+    profile_for,
+    summarize_ingredients,
+)
+
+# The planning, costing and export paths the app runs on every rerun or
+# download, timed without Streamlit at several farm sizes. Save a run with
+# --save and check a later one against it with --compare.
+SIZES = (1, 100, 1000, 10000)
+# Each case repeats until it has run this long (at least once, at most
+# MAX_RUNS times) and the best run is kept.
+TIME_BUDGET = 1.0
+MAX_RUNS = 10
+PRICES = {ingredient: 300.0 + 10 * index for index, ingredient in enumerate(CUSTOM_INGREDIENTS)}
+BAG_SIZE = 50.0
+# Two suppliers per ingredient, with a minimum order and a bulk price break.
+OFFERS = [
+    {"supplier": supplier, "ingredient": ingredient, "bag_kg": bag_kg, "min_bags": min_bags, "price": price * bag_kg / BAG_SIZE * factor}
+    for ingredient, price in PRICES.items()
+    for supplier, bag_kg, first_order in (("Mill", 50.0, 1), ("Depot", 25.0, 10))
+    for min_bags, factor in ((first_order, 1.0), (100, 0.93))
+]
+
+
+def make_groups(count):
+    stages = [(animal, stage) for animal, animal_data in LIVESTOCK_DATA.items() for stage in animal_data["stages"]]
+    return [
+        {
+            "name": f"Barn {i // 10 + 1} pen {i % 10 + 1}",
+            "animal": stages[i % len(stages)][0],
+            "stage": stages[i % len(stages)][1],
+            "count": 50 + i % 200,
+            "days": 30,
+            "ration": {"corn": 60, "soybean meal": 30, "premix": 10} if i % 5 == 0 else None,
+        }
+        for i in range(count)
+    ]
+
+
+def group_plans(groups):
+    return [
+        calculate_group_plan(group["name"], group["animal"], group["stage"], group["count"], group["days"], group["ration"])
+        for group in groups
+    ]
+
+
+def farm_tab(groups):
+    # What My Farm Plan does: a batch plan on the first rerun, then one
+    # newly added group merged in.
+    plan = build_farm_plan(groups[:-1], PRICES, BAG_SIZE)
+    new_feed = add_costs(calculate_group_plan("New", "Pigs", "Grower", 20, 30), PRICES, BAG_SIZE)
+    plan["summary"] = merge_ingredient_summaries(plan["summary"], summarize_ingredients(new_feed))
+    return plan
+
+
+def cases(groups):
+    plan = build_farm_plan(groups, PRICES, BAG_SIZE)
+    unpriced = plan["feed"].drop(columns=["Price per bag", "Cost per kg", "Plan cost", "Bags needed"])
+    sheets = plan_sheets(plan)
+    total_cost = plan["summary"]["Plan cost"].sum()
+    return {
+        "normalize_ration": lambda: [
+            normalize_ration(group["ration"] or profile_for(group["animal"], group["stage"])["ration"])
+            for group in groups
+        ],
+        "calculate_group_plan": lambda: group_plans(groups),
+        "build_schedule": lambda: [
+            build_schedule(group["name"], group["animal"], group["stage"], group["count"], group["days"])
+            for group in groups
+        ],
+        "add_costs": lambda: add_costs(unpriced, PRICES, BAG_SIZE),
+        "farm tab aggregation": lambda: farm_tab(groups),
+        "dataframe_to_excel": lambda: dataframe_to_excel(sheets),
+        "generate_pdf_report": lambda: generate_pdf_report(plan["feed"], plan["schedule"], "ZMW", total_cost),
+        "feed mix chart": lambda: feed_mix_png(tuple(ingredient_totals(plan["feed"]).items())),
+        "procurement plan": lambda: procurement_plan(dict(zip(plan["summary"]["Ingredient"], plan["summary"]["Plan kg"])), OFFERS),
+    }
+
+
+def best_time(call):
+    timings = []
+    while not timings or (sum(timings) < TIME_BUDGET and len(timings) < MAX_RUNS):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(sizes, only=None):
+    results = {}
+    for size in sizes:
+        for name, call in cases(make_groups(size)).items():
+            if only and name not in only:
+                continue
+            results[f"{name} @ {size}"] = elapsed = best_time(call)
+            print(f"{name:<22} {size:>6,} groups {elapsed * 1000:11.2f} ms", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # Cases more than ``tolerance`` times slower than the baseline.
+    slower = {
+        case: (baseline[case], elapsed)
+        for case, elapsed in results.items()
+        if case in baseline and elapsed > baseline[case] * tolerance
+    }
+    for case, (before, after) in slower.items():
+        print(f"SLOWER  {case:<38} {before * 1000:11.2f} ms -> {after * 1000:11.2f} ms")
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the planning, costing and export paths without Streamlit.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Farm sizes in groups.")
+    parser.add_argument("--case", action="append", help="Only run this case; repeat for several.")
+    parser.add_argument("--save", help="Write the timings to this JSON file.")
+    parser.add_argument("--compare", help="JSON file from an earlier --save to check against.")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed slowdown factor (default: 1.5).")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.case)
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if compare(results, baseline, args.tolerance):
+            return 1
+        print(f"No case is more than {args.tolerance}x slower than {args.compare}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
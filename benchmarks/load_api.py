@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from feed_planner import CUSTOM_INGREDIENTS, LIFECYCLE, LIVESTOCK_DATA  # noqa: E402
+
+PRICES = {ingredient: 300.0 + 10 * index for index, ingredient in enumerate(CUSTOM_INGREDIENTS)}
+
+
+def make_requests(count, batch_groups):
+    # Mostly small single-group plans, with schedules, lifetime costs and the
+    # odd large batch mixed in.
+    random.seed(0)
+    stages = [(animal, stage) for animal, data in LIVESTOCK_DATA.items() for stage in data["stages"]]
+    requests = []
+    for number in range(count):
+        animal, stage = random.choice(stages)
+        group = {"animal": animal, "stage": stage, "count": random.randint(10, 500), "days": 30}
+        kind = number % 20
+        if kind == 0:
+            requests.append(("/schedule", {"groups": [group]}))
+        elif kind == 1:
+            requests.append(("/lifetime-cost", {
+                "animal": random.choice(list(LIFECYCLE)), "count": 50, "prices": PRICES, "bag_size": 50,
+            }))
+        elif kind == 2 and batch_groups:
+            groups = [dict(group, name=f"Pen {pen}") for pen in range(batch_groups)]
+            requests.append(("/plan", {"groups": groups, "prices": PRICES, "bag_size": 50}))
+        else:
+            requests.append(("/plan", dict(group, prices=PRICES, bag_size=50)))
+    return [
+        (path, f"POST {path} HTTP/1.1\r\nHost: load\r\nContent-Type: application/json\r\n"
+               f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        for path, body in ((path, json.dumps(payload).encode()) for path, payload in requests)
+    ]
+
+
+async def client(host, port, requests, latencies, failures):
+    reader, writer = await asyncio.open_connection(host, port)
+    for _, request in requests:
+        started = time.perf_counter()
+        writer.write(request)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        length = 0
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - started)
+        failures += [status] if status != 200 else []
+    writer.close()
+
+
+async def load(host, port, connections, requests):
+    latencies, failures = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, requests[index::connections], latencies, failures) for index in range(connections)
+    ))
+    return time.perf_counter() - started, sorted(latencies), failures
+
+
+async def wait_for_server(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the feed planner HTTP API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--batch-groups", type=int, default=200, help="Groups in the occasional batch request.")
+    parser.add_argument("--external", action="store_true", help="Use a server that is already running.")
+    args = parser.parse_args(argv)
+
+    server = None
+    if not args.external:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "feed_planner.api", "--host", args.host, "--port", str(args.port)], cwd=ROOT,
+        )
+    try:
+        asyncio.run(wait_for_server(args.host, args.port))
+        requests = make_requests(args.requests, args.batch_groups)
+        elapsed, latencies, failures = asyncio.run(load(args.host, args.port, args.connections, requests))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    def percentile(share):
+        return latencies[min(len(latencies) - 1, int(share * len(latencies)))] * 1000
+
+    print(f"{len(latencies):,} requests over {args.connections} connections in {elapsed:.2f} s "
+          f"= {len(latencies) / elapsed:,.0f} requests/s")
+    print(f"latency p50 {percentile(0.5):.1f} ms  p90 {percentile(0.9):.1f} ms  p99 {percentile(0.99):.1f} ms")
+    print(f"non-200 responses: {len(failures)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,52 @@
-from io import BytesIO
+from datetime import date
+from functools import partial
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-import pycountry
 import streamlit as st
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+
+from feed_planner import catalogue, storage
+from feed_planner.lifecycle import MAX_DAYS_TO_SALE, MIN_DAYS_TO_SALE
+from feed_planner import (
+    NUTRIENT_LABELS,
+    NUTRIENTS,
+    OFFER_LABELS,
+    STOCK_EVENT_KINDS,
+    add_costs,
+    build_farm_plan,
+    build_schedule,
+    calculate_farm_plan,
+    calculate_group_plan,
+    catalogue_version,
+    cohort_calendar,
+    concat_plan_frames,
+    current_catalogue,
+    dataframe_to_excel,
+    dataframes_to_archive,
+    feed_mix_png,
+    generate_pdf_report,
+    import_groups,
+    ingredient_totals,
+    currency_catalogue,
+    least_cost_ration,
+    lifetime_cost_grid,
+    merge_ingredient_summaries,
+    offers_from_prices,
+    plan_network,
+    plan_sheets,
+    procurement_plan,
+    profile_for,
+    ration_nutrient_vector,
+    record_stock_event,
+    reload_catalogue_if_changed,
+    simulate_lifecycle,
+    simulate_plan_risk,
+    stage_nutrient_vector,
+    stage_nutrients,
+    stock_projection,
+    stock_status,
+    summarize_ingredients,
+)
 
 
 st.set_page_config(
@@ -14,625 +55,259 @@ st.set_page_config(
     layout="wide",
 )
 
+# Picks up an edited catalogue file without a restart. A file that fails
+# its checks is reported and the last good catalogue stays in use.
+if reload_catalogue_if_changed():
+    st.toast(f"Feed catalogue updated to version {catalogue_version()[0]}")
+if catalogue.RELOAD_STATE["error"]:
+    st.warning(f"The feed catalogue file was not reloaded: {catalogue.RELOAD_STATE['error']}")
 
-LIVESTOCK_DATA = {
-    "Chickens": {
-        "unit": "bird",
-        "stages": {
-            "Broiler starter (0-4 weeks)": {
-                "daily_kg": 0.055,
-                "feedings": 3,
-                "ration": {
-                    "corn": 40,
-                    "soybean meal": 25,
-                    "wheat bran": 8,
-                    "fishmeal": 10,
-                    "sunflower meal": 5,
-                    "limestone": 2,
-                    "premix": 5,
-                    "salt": 1,
-                    "dl methionine": 1,
-                    "vegetable oil": 3,
-                },
-                "guidance": "Keep feed fresh and water available all day. Increase feeder space as birds grow.",
-            },
-            "Broiler grower (5-8 weeks)": {
-                "daily_kg": 0.115,
-                "feedings": 2,
-                "ration": {
-                    "corn": 42,
-                    "soybean meal": 22,
-                    "wheat bran": 10,
-                    "fishmeal": 8,
-                    "sunflower meal": 7,
-                    "limestone": 3,
-                    "premix": 4,
-                    "salt": 1,
-                    "dl methionine": 1,
-                    "vegetable oil": 2,
-                },
-                "guidance": "Avoid sudden ration changes. Watch litter condition and remove wet feed quickly.",
-            },
-            "Layers laying (16+ weeks)": {
-                "daily_kg": 0.12,
-                "feedings": 2,
-                "ration": {
-                    "corn": 38,
-                    "soybean meal": 20,
-                    "wheat bran": 10,
-                    "sunflower meal": 8,
-                    "fishmeal": 5,
-                    "limestone": 12,
-                    "premix": 4,
-                    "salt": 1,
-                    "dl methionine": 1,
-                    "vegetable oil": 1,
-                },
-                "guidance": "Calcium is important for laying birds. Provide clean water before morning feed.",
-            },
-        },
-    },
-    "Cattle": {
-        "unit": "head",
-        "stages": {
-            "Calf starter": {
-                "daily_kg": 2.5,
-                "feedings": 2,
-                "ration": {
-                    "maize meal": 35,
-                    "soybean meal": 18,
-                    "wheat bran": 20,
-                    "molasses": 8,
-                    "hay": 12,
-                    "mineral premix": 5,
-                    "salt": 2,
-                },
-                "guidance": "Introduce starter gradually and keep roughage available. Milk plans should be managed separately.",
-            },
-            "Dairy cow in milk": {
-                "daily_kg": 8.0,
-                "feedings": 2,
-                "ration": {
-                    "hay": 35,
-                    "silage": 30,
-                    "maize meal": 16,
-                    "soybean meal": 8,
-                    "wheat bran": 6,
-                    "molasses": 3,
-                    "mineral premix": 1,
-                    "salt": 1,
-                },
-                "guidance": "Split concentrate around milking and keep roughage available. Adjust for milk yield and body condition.",
-            },
-            "Beef grower/finisher": {
-                "daily_kg": 7.0,
-                "feedings": 2,
-                "ration": {
-                    "hay": 30,
-                    "silage": 25,
-                    "maize meal": 25,
-                    "soybean meal": 8,
-                    "wheat bran": 7,
-                    "molasses": 3,
-                    "mineral premix": 1,
-                    "salt": 1,
-                },
-                "guidance": "Make grain increases slowly to reduce digestive upsets. Keep forage in the ration.",
-            },
-        },
-    },
-    "Goats": {
-        "unit": "goat",
-        "stages": {
-            "Kid grower": {
-                "daily_kg": 0.45,
-                "feedings": 2,
-                "ration": {
-                    "hay": 45,
-                    "maize meal": 18,
-                    "soybean meal": 12,
-                    "wheat bran": 15,
-                    "molasses": 5,
-                    "mineral premix": 3,
-                    "salt": 2,
-                },
-                "guidance": "Offer clean forage daily and avoid abrupt grain increases.",
-            },
-            "Doe maintenance": {
-                "daily_kg": 1.2,
-                "feedings": 2,
-                "ration": {
-                    "hay": 65,
-                    "maize meal": 10,
-                    "wheat bran": 12,
-                    "soybean meal": 5,
-                    "molasses": 4,
-                    "mineral premix": 3,
-                    "salt": 1,
-                },
-                "guidance": "Forage should lead the diet. Increase feed for late pregnancy or milk production.",
-            },
-            "Dairy doe": {
-                "daily_kg": 1.8,
-                "feedings": 2,
-                "ration": {
-                    "hay": 50,
-                    "maize meal": 16,
-                    "wheat bran": 14,
-                    "soybean meal": 10,
-                    "molasses": 5,
-                    "mineral premix": 4,
-                    "salt": 1,
-                },
-                "guidance": "Feed after milking where possible and track body condition weekly.",
-            },
-        },
-    },
-    "Sheep": {
-        "unit": "sheep",
-        "stages": {
-            "Lamb grower": {
-                "daily_kg": 0.6,
-                "feedings": 2,
-                "ration": {
-                    "hay": 45,
-                    "maize meal": 22,
-                    "soybean meal": 12,
-                    "wheat bran": 13,
-                    "molasses": 4,
-                    "mineral premix": 3,
-                    "salt": 1,
-                },
-                "guidance": "Keep forage available and introduce concentrate over several days.",
-            },
-            "Ewe maintenance": {
-                "daily_kg": 1.4,
-                "feedings": 2,
-                "ration": {
-                    "hay": 68,
-                    "maize meal": 10,
-                    "wheat bran": 12,
-                    "soybean meal": 4,
-                    "molasses": 3,
-                    "mineral premix": 2,
-                    "salt": 1,
-                },
-                "guidance": "Adjust upward in late pregnancy, cold weather, or poor pasture conditions.",
-            },
-        },
-    },
-    "Pigs": {
-        "unit": "pig",
-        "stages": {
-            "Weaner": {
-                "daily_kg": 1.0,
-                "feedings": 3,
-                "ration": {
-                    "maize meal": 45,
-                    "soybean meal": 24,
-                    "wheat bran": 15,
-                    "fishmeal": 6,
-                    "vegetable oil": 3,
-                    "limestone": 2,
-                    "premix": 4,
-                    "salt": 1,
-                },
-                "guidance": "Use smaller frequent meals and keep troughs clean to prevent stale feed.",
-            },
-            "Grower": {
-                "daily_kg": 2.2,
-                "feedings": 2,
-                "ration": {
-                    "maize meal": 50,
-                    "soybean meal": 18,
-                    "wheat bran": 20,
-                    "fishmeal": 3,
-                    "vegetable oil": 2,
-                    "limestone": 2,
-                    "premix": 4,
-                    "salt": 1,
-                },
-                "guidance": "Keep water available at all times. Sort pigs by size if bullying affects intake.",
-            },
-            "Sow lactating": {
-                "daily_kg": 5.5,
-                "feedings": 3,
-                "ration": {
-                    "maize meal": 48,
-                    "soybean meal": 22,
-                    "wheat bran": 16,
-                    "fishmeal": 4,
-                    "vegetable oil": 3,
-                    "limestone": 2,
-                    "premix": 4,
-                    "salt": 1,
-                },
-                "guidance": "Lactating sows need more feed and water. Increase meals if appetite is high.",
-            },
-        },
-    },
-    "Rabbits": {
-        "unit": "rabbit",
-        "stages": {
-            "Grower": {
-                "daily_kg": 0.12,
-                "feedings": 2,
-                "ration": {
-                    "hay": 55,
-                    "wheat bran": 18,
-                    "maize meal": 10,
-                    "soybean meal": 9,
-                    "sunflower meal": 4,
-                    "mineral premix": 3,
-                    "salt": 1,
-                },
-                "guidance": "High fibre is important. Keep hay and clean water available.",
-            },
-            "Doe lactating": {
-                "daily_kg": 0.25,
-                "feedings": 2,
-                "ration": {
-                    "hay": 48,
-                    "wheat bran": 18,
-                    "maize meal": 13,
-                    "soybean meal": 12,
-                    "sunflower meal": 5,
-                    "mineral premix": 3,
-                    "salt": 1,
-                },
-                "guidance": "Increase feed gradually after kindling and watch kits for signs of poor milk supply.",
-            },
-        },
-    },
-    "Ducks": {
-        "unit": "duck",
-        "stages": {
-            "Duckling starter (0-3 weeks)": {
-                "daily_kg": 0.06,
-                "feedings": 3,
-                "ration": {
-                    "village chicken feed": 70,
-                    "maize bran": 25,
-                    "fishmeal": 5,
-                },
-                "guidance": "Use village chicken feed as the main starter for ducklings, with a little maize bran. Provide shallow water near feed so ducklings can rinse their bills. Keep bedding dry.",
-            },
-            "Duck grower (4-8 weeks)": {
-                "daily_kg": 0.14,
-                "feedings": 2,
-                "ration": {
-                    "maize bran": 50,
-                    "village chicken feed": 25,
-                    "soybean meal": 12,
-                    "fishmeal": 6,
-                    "sunflower meal": 4,
-                    "limestone": 2,
-                    "salt": 1,
-                },
-                "guidance": "Shift more to maize bran as ducks grow. They forage well — use wide, shallow feeders with clean water nearby.",
-            },
-            "Layer duck (20+ weeks)": {
-                "daily_kg": 0.17,
-                "feedings": 2,
-                "ration": {
-                    "corn": 36,
-                    "soybean meal": 22,
-                    "wheat bran": 10,
-                    "sunflower meal": 8,
-                    "fishmeal": 5,
-                    "limestone": 13,
-                    "premix": 4,
-                    "salt": 1,
-                    "dl methionine": 1,
-                },
-                "guidance": "Laying ducks need extra calcium. Feed in the evening to support overnight egg formation.",
-            },
-        },
-    },
-    "Fish": {
-        "unit": "fish",
-        "stages": {
-            "Tilapia fingerling": {
-                "daily_kg": 0.003,
-                "feedings": 4,
-                "ration": {
-                    "fishmeal": 28,
-                    "soybean meal": 30,
-                    "maize meal": 16,
-                    "wheat bran": 12,
-                    "vegetable oil": 4,
-                    "premix": 8,
-                    "salt": 2,
-                },
-                "guidance": "Feed small amounts several times daily and remove uneaten feed.",
-            },
-            "Tilapia grow-out": {
-                "daily_kg": 0.02,
-                "feedings": 3,
-                "ration": {
-                    "fishmeal": 18,
-                    "soybean meal": 32,
-                    "maize meal": 22,
-                    "wheat bran": 14,
-                    "vegetable oil": 4,
-                    "premix": 8,
-                    "salt": 2,
-                },
-                "guidance": "Adjust feeding to water temperature, fish size, and appetite.",
-            },
-        },
-    },
-}
+# The catalogue's tables for this rerun. A reload publishes new ones rather
+# than changing these, so other sessions reloading cannot change them midway.
+CATALOGUE = current_catalogue()
+LIVESTOCK_DATA = CATALOGUE.livestock
+LIFECYCLE = CATALOGUE.lifecycle
+CUSTOM_INGREDIENTS = CATALOGUE.ingredients
 
-# Lifecycle from young stock to sale (free-range farming)
-# days_to_sale: typical days from start to market weight under free-range
-# avg_daily_kg: average daily feed consumption across the lifecycle
-# forage_offset_default: % reduction in purchased feed because animals forage
-# typical_purchase_price_label: what you buy at the start
-LIFECYCLE = {
-    "Chickens": {
-        "days_to_sale": 70,        # broiler raised free-range takes longer than 56d
-        "avg_daily_kg": 0.085,
-        "forage_offset_default": 30,
-        "stock_label": "Day-old chick",
-        "sale_label": "Live broiler at ~2.0 kg",
-    },
-    "Ducks": {
-        "days_to_sale": 84,
-        "avg_daily_kg": 0.110,
-        "forage_offset_default": 40,   # ducks forage well, eat insects/greens
-        "stock_label": "Duckling",
-        "sale_label": "Live duck at ~2.5 kg",
-    },
-    "Cattle": {
-        "days_to_sale": 540,           # 18 months for beef
-        "avg_daily_kg": 6.0,
-        "forage_offset_default": 60,   # mostly pasture
-        "stock_label": "Weaner calf",
-        "sale_label": "Finished beef ~400 kg liveweight",
-    },
-    "Goats": {
-        "days_to_sale": 270,           # 9 months
-        "avg_daily_kg": 0.9,
-        "forage_offset_default": 55,
-        "stock_label": "Weaned kid",
-        "sale_label": "Live goat ~30 kg",
-    },
-    "Sheep": {
-        "days_to_sale": 240,
-        "avg_daily_kg": 1.0,
-        "forage_offset_default": 55,
-        "stock_label": "Weaned lamb",
-        "sale_label": "Live sheep ~35 kg",
-    },
-    "Pigs": {
-        "days_to_sale": 180,
-        "avg_daily_kg": 1.8,
-        "forage_offset_default": 25,   # pigs forage some but need feed
-        "stock_label": "Weaner piglet",
-        "sale_label": "Finished pig ~85 kg",
-    },
-    "Rabbits": {
-        "days_to_sale": 90,
-        "avg_daily_kg": 0.13,
-        "forage_offset_default": 35,
-        "stock_label": "Weaned kit",
-        "sale_label": "Live rabbit ~2.0 kg",
-    },
-    "Fish": {
-        "days_to_sale": 240,
-        "avg_daily_kg": 0.012,
-        "forage_offset_default": 15,   # pond fish get some natural food
-        "stock_label": "Fingerling",
-        "sale_label": "Tilapia ~400 g",
-    },
-}
 
+FEED_MIX_CACHE_ENTRIES = 64
 
-CUSTOM_INGREDIENTS = [
-    "village chicken feed",
-    "maize bran",
-    "corn",
-    "maize meal",
-    "soybean meal",
-    "wheat bran",
-    "fishmeal",
-    "sunflower meal",
-    "rice bran",
-    "hay",
-    "silage",
-    "molasses",
-    "limestone",
-    "premix",
-    "mineral premix",
-    "salt",
-    "dl methionine",
-    "vegetable oil",
-]
-
-FEEDING_WINDOWS = {
-    1: ["07:00"],
-    2: ["07:00", "16:00"],
-    3: ["06:30", "12:30", "17:30"],
-    4: ["06:30", "10:30", "14:30", "17:30"],
-}
 
+@st.cache_data(max_entries=FEED_MIX_CACHE_ENTRIES, show_spinner=False)
+def cached_feed_mix_png(totals):
+    return feed_mix_png(totals)
+
+
+def plot_feed_mix(rows, native=False):
+    # ``rows`` are feed rows or the shopping list; both give the same totals.
+    # The matplotlib chart is drawn once per set of ingredient totals and
+    # reused as a PNG; the native chart skips matplotlib altogether.
+    totals = ingredient_totals(rows)
+    if native:
+        st.bar_chart(
+            totals.rename_axis("Ingredient").reset_index(), x="Ingredient", y="Plan kg",
+            y_label="Kg for plan", x_label="", color="#3f7d58", sort="-Plan kg",
+        )
+    else:
+        st.image(cached_feed_mix_png(tuple(totals.items())), use_container_width=True)
+
+
+APP_CURRENCIES = ("ZMW", "USD", "GBP", "EUR", "ZAR", "KES", "TZS", "UGX")
+
+ANIMAL_EMOJI = {
+    "Chickens": "🐔",
+    "Ducks": "🦆",
+    "Cattle": "🐄",
+    "Goats": "🐐",
+    "Sheep": "🐑",
+    "Pigs": "🐖",
+    "Rabbits": "🐇",
+    "Fish": "🐟",
+}
 
-def get_currencies():
-    common = ["USD", "GBP", "EUR", "ZAR", "KES", "NGN", "GHS", "UGX", "TZS"]
-    all_codes = sorted({currency.alpha_3 for currency in pycountry.currencies})
-    return common + [code for code in all_codes if code not in common]
 
+def format_nutrients(nutrients):
+    return " · ".join(f"{NUTRIENT_LABELS[nutrient]} {value:.2f}" for nutrient, value in nutrients.items())
 
-def profile_for(animal, stage):
-    return LIVESTOCK_DATA[animal]["stages"][stage]
 
+def group_ration(animal, stage):
+    # The mix applied for this animal and stage, else the standard one.
+    return st.session_state.custom_rations.get((animal, stage)) or dict(profile_for(animal, stage)["ration"])
 
-def normalize_ration(ration):
-    total = sum(ration.values())
-    if total <= 0:
-        return {}
-    return {ingredient: percentage / total for ingredient, percentage in ration.items()}
 
+def apply_ration(animal, stage, ration):
+    # Button callback, so it runs before the rerun draws the ration inputs
+    # and can still set their values.
+    st.session_state.custom_rations[(animal, stage)] = ration
+    st.session_state[f"ingredients_{animal}_{stage}"] = list(ration)
+    for ingredient in CUSTOM_INGREDIENTS:
+        key = f"ration_{animal}_{stage}_{ingredient}"
+        if ingredient in ration:
+            st.session_state[key] = float(ration[ingredient])
+        elif key in st.session_state:
+            del st.session_state[key]
 
-def calculate_group_plan(name, animal, stage, count, days, ration_override=None):
-    profile = profile_for(animal, stage)
-    ration = ration_override or profile["ration"]
-    daily_total_kg = profile["daily_kg"] * count
-    normalized = normalize_ration(ration)
-    rows = []
 
-    for ingredient, share in normalized.items():
-        daily_kg = daily_total_kg * share
-        rows.append(
-            {
-                "Group": name,
-                "Animal": animal,
-                "Stage": stage,
-                "Ingredient": ingredient,
-                "Daily kg": daily_kg,
-                "Plan kg": daily_kg * days,
-                "Ration %": share * 100,
-            }
-        )
+def reset_custom_ration(animal, stage):
+    apply_ration(animal, stage, dict(profile_for(animal, stage)["ration"]))
+    del st.session_state.custom_rations[(animal, stage)]
 
-    return pd.DataFrame(rows)
 
+def go_to_step(step):
+    st.session_state.step = step
 
-def build_schedule(name, animal, stage, count, days):
-    profile = profile_for(animal, stage)
-    feedings = profile["feedings"]
-    daily_total_kg = profile["daily_kg"] * count
-    times = FEEDING_WINDOWS.get(feedings, FEEDING_WINDOWS[2])
-    amount_per_feeding = daily_total_kg / len(times)
 
-    return pd.DataFrame(
+DEFAULT_FARM = "My farm"
+
+
+def load_farm(db, farm):
+    settings = storage.load_settings(db, farm)
+    saved_prices = storage.load_prices(db, farm)
+    st.session_state.farm_name = farm
+    st.session_state.farm_region = storage.farm_region(db, farm) or ""
+    st.session_state.farm_groups_seen, st.session_state.farm_groups, _ = storage.changed_groups(db, farm)
+    st.session_state.farm_plan = None
+    st.session_state.s_currency = settings.get("currency", "ZMW")
+    st.session_state.s_bag_size = float(settings.get("bag_size", 50.0))
+    st.session_state.s_default_days = int(settings.get("default_days", 30))
+    st.session_state.s_prices = {ing: float(saved_prices.get(ing, 0.0)) for ing in CUSTOM_INGREDIENTS}
+
+
+def refresh_farm_groups(db, farm):
+    # Other sessions may have added to or cleared the same farm; fetch only
+    # the groups this session has not seen yet.
+    # After a clear the stored plan holds groups that no longer exist, even
+    # if as many new ones have been added since.
+    seen, groups, replace = storage.changed_groups(db, farm, st.session_state.farm_groups_seen)
+    if replace:
+        st.session_state.farm_groups = groups
+        st.session_state.farm_plan = None
+    elif groups:
+        st.session_state.farm_groups = st.session_state.farm_groups + groups
+    st.session_state.farm_groups_seen = seen
+
+
+def save_finance(db, currency, bag_size, default_days, prices):
+    st.session_state.s_currency = currency
+    st.session_state.s_bag_size = float(bag_size)
+    st.session_state.s_default_days = int(default_days)
+    st.session_state.s_prices = prices
+    farm = st.session_state.farm_name
+    storage.save_settings(db, farm, {
+        "currency": currency, "bag_size": float(bag_size), "default_days": int(default_days),
+    })
+    storage.save_prices(db, farm, prices)
+
+
+def edited_offers(offers_df):
+    # Rows from the offers table with an ingredient, bag size and price.
+    offers_df = offers_df.rename(columns={key: label for label, key in OFFER_LABELS.items()})
+    offers_df = offers_df.dropna(subset=["ingredient", "bag_kg", "price"])
+    offers_df = offers_df[(offers_df["bag_kg"] > 0) & (offers_df["price"] > 0)]
+    return [
         {
-            "Group": name,
-            "Animal": animal,
-            "Stage": stage,
-            "Feeding time": times,
-            "Kg per feeding": [amount_per_feeding] * len(times),
-            "Feedings per day": [len(times)] * len(times),
-            "Plan days": [days] * len(times),
+            "supplier": str(offer["supplier"] or "").strip() or "Usual supplier",
+            "ingredient": offer["ingredient"],
+            "bag_kg": float(offer["bag_kg"]),
+            "min_bags": max(1, int(offer["min_bags"])) if pd.notna(offer["min_bags"]) else 1,
+            "price": float(offer["price"]),
         }
+        for offer in offers_df.to_dict("records")
+    ]
+
+
+GROUP_CACHE_ENTRIES = 1024
+
+
+@st.cache_data(max_entries=GROUP_CACHE_ENTRIES, show_spinner=False)
+def cached_group_plan(animal, stage, count, days, ration_items, price_items, bag_size, version):
+    # ``version`` is only part of the cache key, so a reloaded catalogue
+    # never serves plans built from the old one.
+    feed_df = calculate_group_plan("", animal, stage, count, days, dict(ration_items))
+    return add_costs(feed_df, dict(price_items), bag_size)
+
+
+def priced_group_plan(group, prices, bag_size):
+    feed_df = cached_group_plan(
+        group["animal"], group["stage"], int(group["count"]), int(group["days"]),
+        tuple((group.get("ration") or {}).items()), tuple(sorted(prices.items())), float(bag_size),
+        catalogue_version(),
     )
+    feed_df["Group"] = feed_df["Group"].cat.rename_categories([group["name"]])
+    return feed_df
+
+
+PLAN_FRAMES = ("feed", "schedule", "groups")
+
+
+def sync_farm_plan(plan, groups, prices, bag_size):
+    # Only groups appended since the last rerun are planned. Their rows are
+    # kept as parts of the feed, schedule and groups frames, joined only when
+    # a frame is read (farm_frame), and added to the running shopping list.
+    # A price, bag size or catalogue change starts again from one batch pass
+    # over the groups. Groups are only ever appended or cleared together, and
+    # a cleared farm's plan is dropped (refresh_farm_groups), so the plan is
+    # then built from the groups added since.
+    signature = (tuple(sorted(prices.items())), float(bag_size), catalogue_version())
+    if plan is None or plan["signature"] != signature or plan["size"] > len(groups):
+        full = build_farm_plan(groups, prices, bag_size)
+        return {
+            "signature": signature,
+            "size": len(groups),
+            "parts": {name: [full[name]] for name in PLAN_FRAMES},
+            "summary": full["summary"],
+        }
 
+    new_groups = groups[plan["size"]:]
+    if not new_groups:
+        return plan
 
-def add_costs(feed_df, prices, bag_size):
-    priced = feed_df.copy()
-    priced["Price per bag"] = priced["Ingredient"].map(prices).fillna(0.0)
-    priced["Cost per kg"] = priced["Price per bag"] / bag_size
-    priced["Plan cost"] = priced["Plan kg"] * priced["Cost per kg"]
-    priced["Bags needed"] = priced["Plan kg"] / bag_size
-    return priced
-
-
-def dataframe_to_excel(sheets):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        for sheet_name, dataframe in sheets.items():
-            dataframe.to_excel(writer, sheet_name=sheet_name[:31], index=False)
-    return output.getvalue()
-
-
-def generate_pdf_report(feed_df, schedule_df, currency, total_cost):
-    buffer = BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
-    y = height - 48
-
-    pdf.setFont("Helvetica-Bold", 16)
-    pdf.drawString(40, y, "Farm Feed Planner")
-    y -= 22
-    pdf.setFont("Helvetica", 10)
-    pdf.drawString(40, y, "Planning guide only. Confirm final rations with a local livestock nutrition expert.")
-    y -= 30
-
-    pdf.setFont("Helvetica-Bold", 12)
-    pdf.drawString(40, y, f"Total estimated plan cost: {total_cost:,.2f} {currency}")
-    y -= 24
-
-    pdf.setFont("Helvetica-Bold", 11)
-    pdf.drawString(40, y, "Feed Requirements")
-    y -= 16
-    pdf.setFont("Helvetica", 9)
-
-    summary = feed_df.groupby(["Group", "Ingredient"], as_index=False).agg({"Plan kg": "sum", "Plan cost": "sum"})
-    for _, row in summary.head(28).iterrows():
-        if y < 70:
-            pdf.showPage()
-            y = height - 48
-            pdf.setFont("Helvetica", 9)
-        pdf.drawString(
-            40,
-            y,
-            f"{row['Group']} - {row['Ingredient']}: {row['Plan kg']:.1f} kg, {row['Plan cost']:.2f} {currency}",
-        )
-        y -= 14
-
-    y -= 10
-    pdf.setFont("Helvetica-Bold", 11)
-    pdf.drawString(40, y, "Daily Feeding Times")
-    y -= 16
-    pdf.setFont("Helvetica", 9)
-
-    for _, row in schedule_df.head(32).iterrows():
-        if y < 70:
-            pdf.showPage()
-            y = height - 48
-            pdf.setFont("Helvetica", 9)
-        pdf.drawString(
-            40,
-            y,
-            f"{row['Group']} - {row['Feeding time']}: {row['Kg per feeding']:.2f} kg",
-        )
-        y -= 14
+    new_feed = concat_plan_frames([priced_group_plan(group, prices, bag_size) for group in new_groups])
+    _, new_schedule, new_groups_df = calculate_farm_plan(new_groups)
+    for name, part in zip(PLAN_FRAMES, (new_feed, new_schedule, new_groups_df)):
+        plan["parts"][name].append(part)
+    plan["summary"] = merge_ingredient_summaries(plan["summary"], summarize_ingredients(new_feed))
+    plan["size"] = len(groups)
+    # Exports, the calendar and risk runs were for the smaller farm.
+    for key in ("exports", "calendar", "risk"):
+        plan.pop(key, None)
+    return plan
 
-    pdf.save()
-    buffer.seek(0)
-    return buffer
 
+def farm_frame(plan, name):
+    # The plan's feed, schedule or groups frame, with any parts added since
+    # it was last read joined once and kept.
+    parts = plan["parts"][name]
+    if len(parts) > 1:
+        parts[:] = [concat_plan_frames(parts)]
+    return parts[0]
 
-def plot_feed_mix(feed_df):
-    ingredient_totals = feed_df.groupby("Ingredient", as_index=False)["Plan kg"].sum()
-    ingredient_totals = ingredient_totals.sort_values("Plan kg", ascending=False)
-    fig, ax = plt.subplots(figsize=(8, 4.5))
-    ax.bar(ingredient_totals["Ingredient"], ingredient_totals["Plan kg"], color="#3f7d58")
-    ax.set_ylabel("Kg for plan")
-    ax.set_xlabel("")
-    ax.tick_params(axis="x", rotation=35)
-    ax.spines["top"].set_visible(False)
-    ax.spines["right"].set_visible(False)
-    fig.tight_layout()
-    return fig
 
+def full_farm_plan(plan):
+    return dict(plan, **{name: farm_frame(plan, name) for name in PLAN_FRAMES})
 
 
-ANIMAL_EMOJI = {
-    "Chickens": "🐔",
-    "Ducks": "🦆",
-    "Cattle": "🐄",
-    "Goats": "🐐",
-    "Sheep": "🐑",
-    "Pigs": "🐖",
-    "Rabbits": "🐇",
-    "Fish": "🐟",
-}
+def farm_excel(plan):
+    return dataframe_to_excel(plan_sheets(full_farm_plan(plan)))
 
 
-def reset_custom_ration(animal, stage):
-    profile = profile_for(animal, stage)
-    st.session_state.custom_ration = dict(profile["ration"])
+def farm_archive(plan, table_format):
+    return dataframes_to_archive(plan_sheets(full_farm_plan(plan)), table_format)
 
 
-def go_to_step(step):
-    st.session_state.step = step
+def farm_pdf(plan, currency):
+    total_cost = plan["summary"]["Plan cost"].sum()
+    return generate_pdf_report(farm_frame(plan, "feed"), farm_frame(plan, "schedule"), currency, total_cost).getvalue()
+
+
+def network_excel(network):
+    return dataframe_to_excel({
+        "Regions": network["region_totals"],
+        "Regional Orders": network["regions"],
+        "Farms": network["farms"],
+        "Farm Orders": network["farm_ingredients"],
+    })
+
+
+def export_on_demand(plan, key, build, *args):
+    # Download buttons call this only when clicked; the file is kept on the
+    # plan so it is rebuilt only after the plan itself changes.
+    def export():
+        exports = plan.setdefault("exports", {})
+        if key not in exports:
+            exports[key] = build(plan, *args)
+        return exports[key]
+    return export
 
 
 # ---- Session state ----
-if "farm_groups" not in st.session_state:
-    st.session_state.farm_groups = []
+if "farm_db" not in st.session_state:
+    st.session_state.farm_db = storage.connect(check_same_thread=False)
+farm_db = st.session_state.farm_db
+if "farm_name" not in st.session_state:
+    load_farm(farm_db, DEFAULT_FARM)
+if "farm_plan" not in st.session_state:
+    st.session_state.farm_plan = None
 if "step" not in st.session_state:
     st.session_state.step = 1
 if "w_animal" not in st.session_state:
@@ -645,18 +320,10 @@ if "w_days" not in st.session_state:
     st.session_state.w_days = 30
 if "w_group_name" not in st.session_state:
     st.session_state.w_group_name = "My group"
-if "s_currency" not in st.session_state:
-    st.session_state.s_currency = "ZMW"
-if "s_bag_size" not in st.session_state:
-    st.session_state.s_bag_size = 50.0
-if "s_default_days" not in st.session_state:
-    st.session_state.s_default_days = 30
-if "s_prices" not in st.session_state:
-    st.session_state.s_prices = {ing: 0.0 for ing in CUSTOM_INGREDIENTS}
-if "custom_ration" not in st.session_state:
-    first_animal = next(iter(LIVESTOCK_DATA))
-    first_stage = next(iter(LIVESTOCK_DATA[first_animal]["stages"]))
-    st.session_state.custom_ration = dict(profile_for(first_animal, first_stage)["ration"])
+if "w_start" not in st.session_state:
+    st.session_state.w_start = date.today()
+if "custom_rations" not in st.session_state:
+    st.session_state.custom_rations = {}
 
 
 # ---- Styles ----
@@ -841,6 +508,16 @@ st.markdown(
 # ---- Sidebar: just reset ----
 with st.sidebar:
     st.header("Menu")
+    farm_name = st.text_input("Farm", value=st.session_state.farm_name).strip() or DEFAULT_FARM
+    if farm_name != st.session_state.farm_name:
+        load_farm(farm_db, farm_name)
+        st.rerun()
+    farm_region = st.text_input(
+        "Region", value=st.session_state.farm_region, help="Groups farms together in the Farm Network tab.",
+    ).strip()
+    if farm_region != st.session_state.farm_region:
+        storage.set_farm_region(farm_db, st.session_state.farm_name, farm_region)
+        st.session_state.farm_region = farm_region
     st.markdown(
         f"**Currency:** {st.session_state.s_currency}  \n"
         f"**Bag size:** {st.session_state.s_bag_size:.0f} kg  \n"
@@ -864,7 +541,9 @@ prices = st.session_state.s_prices
 
 
 # ---- Tabs ----
-tab_plan, tab_farm, tab_reference = st.tabs(["📋 Quick Plan", "🚜 My Farm Plan", "📖 Feed Guide"])
+tab_plan, tab_farm, tab_network, tab_reference = st.tabs(
+    ["📋 Quick Plan", "🚜 My Farm Plan", "🌍 Farm Network", "📖 Feed Guide"]
+)
 
 
 def render_step_bar(current):
@@ -911,11 +590,8 @@ with tab_plan:
             unsafe_allow_html=True,
         )
 
-        currency_options = ["ZMW", "USD", "GBP", "EUR", "ZAR", "KES", "TZS", "UGX"]
-        other = [c for c in get_currencies() if c not in currency_options]
-        all_currencies = currency_options + other
-        current_currency_idx = all_currencies.index(st.session_state.s_currency) \
-            if st.session_state.s_currency in all_currencies else 0
+        all_currencies, currency_index = currency_catalogue(APP_CURRENCIES)
+        current_currency_idx = currency_index.get(st.session_state.s_currency, 0)
 
         f1, f2, f3 = st.columns(3)
         with f1:
@@ -947,17 +623,11 @@ with tab_plan:
         st.markdown("---")
         b1, b2 = st.columns([0.35, 0.65])
         if b1.button("⬅️  Back", key="back_to_1"):
-            st.session_state.s_currency = new_currency
-            st.session_state.s_bag_size = float(new_bag)
-            st.session_state.s_default_days = int(new_default_days)
-            st.session_state.s_prices = new_prices
+            save_finance(farm_db, new_currency, new_bag, new_default_days, new_prices)
             st.session_state.step = 1
             st.rerun()
         if b2.button("Continue  ➡️", key="to_step_3", type="primary", use_container_width=True):
-            st.session_state.s_currency = new_currency
-            st.session_state.s_bag_size = float(new_bag)
-            st.session_state.s_default_days = int(new_default_days)
-            st.session_state.s_prices = new_prices
+            save_finance(farm_db, new_currency, new_bag, new_default_days, new_prices)
             st.session_state.w_days = int(new_default_days)
             st.session_state.step = 3
             st.rerun()
@@ -1016,6 +686,11 @@ with tab_plan:
 
         group_name = st.text_input("Name this group (optional)", value=st.session_state.w_group_name)
         st.session_state.w_group_name = group_name
+        start_date = st.date_input(
+            "Start date", value=st.session_state.w_start,
+            help="When this group starts on this feed. Used for the production calendar in My Farm Plan.",
+        )
+        st.session_state.w_start = start_date
 
         st.markdown("---")
         b1, b2 = st.columns([0.4, 0.6])
@@ -1043,9 +718,11 @@ with tab_plan:
         profile = profile_for(animal, stage)
         st.markdown(f"<div class='small-note'>💡 {profile['guidance']}</div>", unsafe_allow_html=True)
 
-        ration = dict(profile["ration"])
-        preview_df = calculate_group_plan(group_name, animal, stage, count, days, ration)
-        preview_df = add_costs(preview_df, prices, bag_size)
+        ration = group_ration(animal, stage)
+        preview_df = priced_group_plan(
+            {"name": group_name, "animal": animal, "stage": stage, "count": count, "days": days, "ration": ration},
+            prices, bag_size,
+        )
         schedule_df = build_schedule(group_name, animal, stage, count, days)
 
         daily_kg = profile["daily_kg"] * count
@@ -1095,7 +772,7 @@ with tab_plan:
             with lc2:
                 days_to_sale = st.number_input(
                     "Days to sale",
-                    min_value=30, max_value=1095,
+                    min_value=MIN_DAYS_TO_SALE, max_value=MAX_DAYS_TO_SALE,
                     value=int(lc["days_to_sale"]),
                     step=10,
                 )
@@ -1106,17 +783,17 @@ with tab_plan:
                     help="What you pay per young animal at the start.",
                 )
 
-            # Cost per kg of feed (weighted by ration share)
-            normalized = normalize_ration(ration)
-            cost_per_kg_of_mix = sum(
-                normalized.get(ing, 0) * (prices.get(ing, 0.0) / bag_size)
-                for ing in normalized
+            # Day by day through each stage's ration, with growth and mortality
+            lifecycle_sim = simulate_lifecycle([{
+                "name": group_name, "animal": animal, "count": count,
+                "days_to_sale": days_to_sale, "forage_pct": forage_pct,
+            }])
+            lifetime_kg_total = lifecycle_sim["groups"]["Feed kg"].iloc[0]
+            expected_at_sale = lifecycle_sim["groups"]["Expected at sale"].iloc[0]
+            lifetime_ingredient_kg = lifecycle_sim["ingredients"].drop(columns="Day").sum()
+            lifetime_feed_cost = sum(
+                kg * prices.get(ing, 0.0) / bag_size for ing, kg in lifetime_ingredient_kg.items()
             )
-
-            forage_factor = 1 - (forage_pct / 100.0)
-            lifetime_kg_per_animal = lc["avg_daily_kg"] * days_to_sale * forage_factor
-            lifetime_kg_total = lifetime_kg_per_animal * count
-            lifetime_feed_cost = lifetime_kg_total * cost_per_kg_of_mix
             lifetime_stock_cost = stock_price * count
             lifetime_total = lifetime_feed_cost + lifetime_stock_cost
             cost_per_animal = lifetime_total / count if count else 0
@@ -1133,10 +810,44 @@ with tab_plan:
                 f"to <i>{lc['sale_label'].lower()}</i> over {days_to_sale} days, free-range.<br>"
                 f"<b>Feed cost:</b> {lifetime_feed_cost:,.0f} {currency} &nbsp;·&nbsp; "
                 f"<b>Stock cost:</b> {lifetime_stock_cost:,.0f} {currency} &nbsp;·&nbsp; "
-                f"<b>Forage saving applied:</b> {forage_pct}%"
+                f"<b>Forage saving applied:</b> {forage_pct}%<br>"
+                f"<b>Expected at sale:</b> {expected_at_sale:,.0f} of {count} "
+                f"({lc['mortality_pct']}% typical losses)"
                 f"</div>",
                 unsafe_allow_html=True,
             )
+            st.line_chart(lifecycle_sim["daily"], x="Day", y="Feed kg", height=220)
+
+            with st.expander("🗺️ Cost at a glance — every forage saving and sale day"):
+                st.caption(
+                    "Lifetime cost for each forage saving (columns) and days to sale (rows), "
+                    "worked out in one go. Greener is cheaper."
+                )
+                g1, g2, g3 = st.columns(3)
+                stock_low = g1.number_input("Stock price from", min_value=0.0, value=0.0, step=1.0)
+                stock_high = g2.number_input(
+                    "Stock price to", min_value=0.0, value=max(stock_price * 2, stock_low), step=1.0,
+                )
+                grid_measure = g3.radio("Show", ["Cost per animal", "Total cost"], horizontal=True)
+                cost_grid = lifetime_cost_grid(
+                    animal, count, prices, bag_size,
+                    stock_prices=np.linspace(stock_low, max(stock_high, stock_low), 5),
+                )
+                grid_stock = st.select_slider(
+                    f"{lc['stock_label']} price each",
+                    options=cost_grid["stock_prices"].tolist(),
+                    format_func="{:,.0f}".format,
+                )
+                grid_values = cost_grid["cost_per_animal" if grid_measure == "Cost per animal" else "total_cost"]
+                grid_df = pd.DataFrame(
+                    grid_values[:, :, cost_grid["stock_prices"].tolist().index(grid_stock)].T,
+                    index=pd.Index(cost_grid["days_to_sale"], name="Days to sale"),
+                    columns=[f"{pct:.0f}% forage" for pct in cost_grid["forage_pct"]],
+                )
+                st.dataframe(
+                    grid_df.style.format("{:,.0f}").background_gradient(cmap="RdYlGn_r", axis=None),
+                    use_container_width=True, height=420,
+                )
 
         st.subheader("🕒 Daily Feeding Times")
         st.dataframe(
@@ -1148,28 +859,59 @@ with tab_plan:
         )
 
         with st.expander("🔧 Advanced — adjust the ration mix"):
-            if st.button("Reset to default ration"):
-                reset_custom_ration(animal, stage)
-                st.rerun()
-            active_ingredients = st.multiselect(
-                "Ingredients in this ration",
-                CUSTOM_INGREDIENTS,
-                default=list(ration.keys()),
-            )
+            st.button("Reset to default ration", on_click=reset_custom_ration, args=(animal, stage))
+            # The inputs start from the ration in use; apply_ration updates
+            # them when another mix is applied.
+            ingredients_key = f"ingredients_{animal}_{stage}"
+            if ingredients_key not in st.session_state:
+                st.session_state[ingredients_key] = list(ration)
+            active_ingredients = st.multiselect("Ingredients in this ration", CUSTOM_INGREDIENTS, key=ingredients_key)
             custom_ration = {}
             for ingredient in active_ingredients:
-                default_value = float(
-                    st.session_state.custom_ration.get(ingredient, ration.get(ingredient, 0))
-                )
+                key = f"ration_{animal}_{stage}_{ingredient}"
+                if key not in st.session_state:
+                    st.session_state[key] = float(ration.get(ingredient, 0))
                 custom_ration[ingredient] = st.number_input(
-                    f"{ingredient.title()} %",
-                    min_value=0.0, max_value=100.0,
-                    value=default_value, step=0.5,
-                    key=f"ration_{animal}_{stage}_{ingredient}",
+                    f"{ingredient.title()} %", min_value=0.0, max_value=100.0, step=0.5, key=key,
                 )
-            if custom_ration and st.button("Apply custom ration"):
-                st.session_state.custom_ration = custom_ration
-                st.rerun()
+            if custom_ration:
+                st.dataframe(
+                    pd.DataFrame({
+                        "Nutrient": [NUTRIENT_LABELS[nutrient] for nutrient in NUTRIENTS],
+                        "This mix": ration_nutrient_vector(custom_ration),
+                        "Standard": stage_nutrient_vector(animal, stage),
+                    }).style.format({"This mix": "{:.2f}", "Standard": "{:.2f}"}),
+                    use_container_width=True, hide_index=True,
+                )
+            if sum(custom_ration.values()) > 0:
+                st.button("Apply custom ration", on_click=apply_ration, args=(animal, stage, custom_ration))
+
+            st.markdown("**💡 Cheapest mix**")
+            st.caption(
+                "Uses your Step 2 prices to find the cheapest mix of these ingredients that keeps "
+                "protein, energy, calcium and methionine close to the standard ration."
+            )
+            if st.button("Find cheapest mix"):
+                st.session_state.least_cost = (
+                    animal, stage,
+                    least_cost_ration(animal, stage, prices, bag_size, ingredients=active_ingredients or None),
+                )
+            least_cost = st.session_state.get("least_cost")
+            if least_cost and least_cost[:2] == (animal, stage):
+                result = least_cost[2]
+                if result is None:
+                    st.info("No cheaper mix found. Add feed prices in Step 2 or include more ingredients.")
+                else:
+                    saving = result["template_cost_per_kg"] - result["cost_per_kg"]
+                    st.markdown(
+                        f"Cost per kg: **{result['cost_per_kg']:,.2f} {currency}** "
+                        f"(standard mix {result['template_cost_per_kg']:,.2f}, saving {saving:,.2f})"
+                    )
+                    st.dataframe(
+                        pd.DataFrame({"Ingredient": list(result["ration"]), "Ration %": list(result["ration"].values())}),
+                        use_container_width=True, hide_index=True,
+                    )
+                    st.button("Use cheapest mix", on_click=apply_ration, args=(animal, stage, dict(result["ration"])))
 
         st.markdown("---")
         b1, b2, b3 = st.columns([0.33, 0.34, 0.33])
@@ -1177,14 +919,16 @@ with tab_plan:
             st.session_state.step = 4
             st.rerun()
         if b2.button("➕ Add to My Farm Plan", type="primary", use_container_width=True):
-            st.session_state.farm_groups.append({
+            storage.add_groups(farm_db, st.session_state.farm_name, [{
                 "name": group_name,
                 "animal": animal,
                 "stage": stage,
                 "count": count,
                 "days": days,
                 "ration": ration,
-            })
+                "start": st.session_state.w_start.isoformat(),
+            }])
+            refresh_farm_groups(farm_db, st.session_state.farm_name)
             st.success(f"Added {group_name} to your Farm Plan.")
         if b3.button("🔄 Plan Another Animal", use_container_width=True):
             st.session_state.step = 1
@@ -1195,43 +939,34 @@ with tab_plan:
 
 with tab_farm:
     st.subheader("🚜 My Farm Plan")
+    with st.expander("📤 Import groups from a file"):
+        st.caption(
+            "CSV or Excel with columns name, animal, stage, count and days, plus optional "
+            "ration (JSON such as {\"corn\": 60, \"soybean meal\": 40}) and start (YYYY-MM-DD). "
+            "Animal and stage names must match the Feed Guide."
+        )
+        upload = st.file_uploader("Groups file", type=["csv", "xlsx"])
+        if upload is not None and st.button("Import groups"):
+            result = import_groups(
+                upload, partial(storage.add_groups, farm_db, st.session_state.farm_name),
+                default_days=default_days, file_name=upload.name,
+            )
+            if result["imported"]:
+                st.success(f"Added {result['imported']:,} group(s) to your Farm Plan.")
+            if result["error_count"]:
+                st.error(f"{result['error_count']:,} row(s) could not be imported.")
+                st.dataframe(result["errors"], use_container_width=True, hide_index=True)
+    refresh_farm_groups(farm_db, st.session_state.farm_name)
     if not st.session_state.farm_groups:
         st.info("No groups yet. Use the Quick Plan tab to add an animal group.")
     else:
-        farm_feed_frames = []
-        farm_schedule_frames = []
-        group_rows = []
-
-        for group in st.session_state.farm_groups:
-            feed_df = calculate_group_plan(
-                group["name"], group["animal"], group["stage"],
-                group["count"], group["days"], group["ration"],
-            )
-            farm_feed_frames.append(feed_df)
-            farm_schedule_frames.append(
-                build_schedule(group["name"], group["animal"], group["stage"], group["count"], group["days"])
-            )
-            profile = profile_for(group["animal"], group["stage"])
-            group_rows.append({
-                "Group": group["name"],
-                "Animal": group["animal"],
-                "Stage": group["stage"],
-                "Count": group["count"],
-                "Days": group["days"],
-                "Daily kg": profile["daily_kg"] * group["count"],
-            })
-
-        farm_feed = add_costs(pd.concat(farm_feed_frames, ignore_index=True), prices, bag_size)
-        farm_schedule = pd.concat(farm_schedule_frames, ignore_index=True)
-        groups_df = pd.DataFrame(group_rows)
-        ingredient_summary = farm_feed.groupby("Ingredient", as_index=False).agg({
-            "Daily kg": "sum", "Plan kg": "sum",
-            "Bags needed": "sum", "Plan cost": "sum",
-        })
-
-        total_daily = farm_feed["Daily kg"].sum()
-        total_plan = farm_feed["Plan kg"].sum()
-        total_cost = farm_feed["Plan cost"].sum()
+        farm_plan = sync_farm_plan(st.session_state.farm_plan, st.session_state.farm_groups, prices, bag_size)
+        st.session_state.farm_plan = farm_plan
+        ingredient_summary = farm_plan["summary"]
+
+        total_daily = ingredient_summary["Daily kg"].sum()
+        total_plan = ingredient_summary["Plan kg"].sum()
+        total_cost = ingredient_summary["Plan cost"].sum()
 
         m = st.columns(4)
         m[0].metric("Groups", len(st.session_state.farm_groups))
@@ -1239,11 +974,11 @@ with tab_farm:
         m[2].metric("Plan feed", f"{total_plan:,.1f} kg")
         m[3].metric("Plan cost", f"{total_cost:,.2f} {currency}")
 
-        st.pyplot(plot_feed_mix(farm_feed), use_container_width=True)
+        plot_feed_mix(ingredient_summary, native=st.toggle("Simple chart", help="A lighter chart that draws in the browser."))
 
         st.subheader("🐾 Groups")
         st.dataframe(
-            groups_df.style.format({"Daily kg": "{:.2f}"}),
+            farm_frame(farm_plan, "groups").style.format({"Daily kg": "{:.2f}"}),
             use_container_width=True, hide_index=True,
         )
 
@@ -1256,37 +991,247 @@ with tab_farm:
             use_container_width=True, hide_index=True,
         )
 
-        st.subheader("🕒 Feeding Schedule")
+        with st.expander("🏷️ Buy whole bags from suppliers"):
+            st.caption(
+                "List what each supplier sells: bag size, price per bag and the fewest bags they sell at that "
+                "price. Add a row with more bags and a lower price for each bulk discount; the smallest "
+                "order is their minimum order. The cheapest whole-bag order covering the shopping list is "
+                "worked out below."
+            )
+            saved_offers = storage.load_offers(farm_db, st.session_state.farm_name)
+            offers_df = st.data_editor(
+                pd.DataFrame(
+                    saved_offers or offers_from_prices(prices, bag_size), columns=list(OFFER_LABELS)
+                ).rename(columns=OFFER_LABELS),
+                num_rows="dynamic", use_container_width=True, hide_index=True, key="offers_editor",
+                column_config={
+                    "Ingredient": st.column_config.SelectboxColumn(options=CUSTOM_INGREDIENTS, required=True),
+                    "Bag kg": st.column_config.NumberColumn(min_value=0.1, step=0.5),
+                    "Min bags": st.column_config.NumberColumn(min_value=1, step=1, default=1),
+                    "Price per bag": st.column_config.NumberColumn(min_value=0.0, format="%.2f"),
+                },
+            )
+            offers = edited_offers(offers_df)
+            if st.button("💾 Save suppliers"):
+                storage.save_offers(farm_db, st.session_state.farm_name, offers)
+                st.success("Supplier offers saved.")
+
+            purchase = procurement_plan(dict(zip(ingredient_summary["Ingredient"], ingredient_summary["Plan kg"])), offers)
+            p = st.columns(3)
+            p[0].metric("Bags to buy", f"{int(purchase['orders']['Bags'].sum()):,}")
+            p[1].metric("Order cost", f"{purchase['total_cost']:,.2f} {currency}")
+            p[2].metric("Spare feed", f"{purchase['ingredients']['Spare kg'].sum():,.1f} kg")
+            st.dataframe(
+                purchase["orders"].style.format({
+                    "Bag kg": "{:g}", "Price per bag": "{:,.2f}", "Kg bought": "{:,.1f}", "Cost": "{:,.2f}",
+                }),
+                use_container_width=True, hide_index=True,
+            )
+            if offers and purchase["missing"]:
+                st.warning(f"No supplier listed for: {', '.join(purchase['missing'])}.")
+
+        with st.expander("📦 Stock on hand and reorder dates"):
+            st.caption(
+                "Record deliveries, losses and stock counts. Stock is run down each day at the "
+                "plan's daily use, and each ingredient shows how long it lasts and the last day to reorder."
+            )
+            farm_settings = storage.load_settings(farm_db, st.session_state.farm_name)
+            k = st.columns(2)
+            lead_time = int(k[0].number_input(
+                "Delivery lead time (days)", min_value=0, value=int(farm_settings.get("lead_days", 7)), step=1,
+            ))
+            safety_days = int(k[1].number_input(
+                "Safety stock (days)", min_value=0, value=int(farm_settings.get("safety_days", 3)), step=1,
+                help="Extra days of feed to keep in case a delivery is late.",
+            ))
+            if (lead_time, safety_days) != (farm_settings.get("lead_days", 7), farm_settings.get("safety_days", 3)):
+                storage.save_settings(farm_db, st.session_state.farm_name, {"lead_days": lead_time, "safety_days": safety_days})
+
+            daily_use = dict(zip(ingredient_summary["Ingredient"], ingredient_summary["Daily kg"]))
+            with st.form("stock_event", clear_on_submit=True):
+                e = st.columns(4)
+                stock_ingredient = e[0].selectbox("Ingredient", CUSTOM_INGREDIENTS)
+                stock_kind = e[1].selectbox("What happened", STOCK_EVENT_KINDS, format_func=str.capitalize)
+                stock_kg = e[2].number_input("Kg", min_value=0.0, step=50.0)
+                stock_day = e[3].date_input("Date", value=date.today())
+                if st.form_submit_button("Record"):
+                    record_stock_event(
+                        farm_db, st.session_state.farm_name,
+                        {"ingredient": stock_ingredient, "day": stock_day, "kind": stock_kind, "kg": stock_kg},
+                        daily_use.get(stock_ingredient, 0.0),
+                    )
+
+            stock_levels = storage.load_stock_levels(farm_db, st.session_state.farm_name)
+            stock = stock_status(stock_levels, daily_use, lead_days=dict.fromkeys(daily_use, lead_time), safety_days=safety_days)
+            st.dataframe(
+                stock.style.format({
+                    "On hand kg": "{:,.1f}", "Daily kg": "{:.2f}", "Days of cover": "{:,.0f}",
+                    "Runs out": "{:%d %b %Y}", "Reorder point kg": "{:,.1f}", "Reorder by": "{:%d %b %Y}",
+                }, na_rep="—"),
+                use_container_width=True, hide_index=True,
+            )
+            if stock_levels:
+                st.line_chart(stock_projection(stock_levels, daily_use), height=220)
+                st.markdown("**Latest stock records**")
+                st.dataframe(
+                    pd.DataFrame(storage.load_stock_events(farm_db, st.session_state.farm_name, limit=20)[::-1]),
+                    use_container_width=True, hide_index=True,
+                )
+
+        st.subheader("📅 Production Calendar")
+        if "calendar" not in farm_plan:
+            farm_plan["calendar"] = cohort_calendar(st.session_state.farm_groups, bag_size)
+        calendar = farm_plan["calendar"]
+        c = st.columns(3)
+        c[0].metric("Calendar", f"{len(calendar['daily'])} days")
+        c[1].metric("Peak daily feed", f"{calendar['peak_kg']:,.1f} kg")
+        c[2].metric("Peak day", f"{calendar['peak_date']:%d %b %Y}")
+        st.caption("Groups overlap by their start dates. Bags are bought weekly; part bags carry over.")
+        st.line_chart(calendar["daily"]["Total kg"], height=220)
         st.dataframe(
-            farm_schedule.style.format({"Kg per feeding": "{:.2f}"}),
+            calendar["bags"].reset_index().style.format({"Week of": "{:%d %b %Y}"}),
             use_container_width=True, hide_index=True,
         )
 
-        excel_file = dataframe_to_excel({
-            "Groups": groups_df,
-            "Shopping List": ingredient_summary,
-            "Feed Details": farm_feed,
-            "Schedule": farm_schedule,
-        })
-        pdf_file = generate_pdf_report(farm_feed, farm_schedule, currency, total_cost)
+        with st.expander("📈 Feed to sale, day by day"):
+            st.caption(
+                "Each group raised from young stock to sale through its feeding stages, "
+                "with typical growth, losses and forage saving."
+            )
+            farm_lifecycle = simulate_lifecycle([
+                {"name": group["name"], "animal": group["animal"], "count": group["count"]}
+                for group in st.session_state.farm_groups
+                if group["animal"] in LIFECYCLE
+            ])
+            st.line_chart(farm_lifecycle["daily"], x="Day", y="Feed kg", height=260)
+            st.dataframe(
+                farm_lifecycle["groups"].style.format({"Expected at sale": "{:,.0f}", "Feed kg": "{:,.1f}"}),
+                use_container_width=True, hide_index=True,
+            )
+
+        with st.expander("🎲 Cost risk — prices, forage and losses"):
+            st.caption(
+                "Runs the plan through many random seasons: ingredient prices move, "
+                "forage saving varies around each animal's typical value and losses "
+                "come in higher or lower than usual."
+            )
+            r = st.columns(4)
+            risk_scenarios = r[0].selectbox("Scenarios", [10_000, 100_000], format_func="{:,}".format)
+            price_swing = r[1].slider("Price swing (%)", 0, 60, 25, 5, help="Typical price move either way.")
+            risk_forage = r[2].checkbox("Animals forage", value=True, help="Free-range animals buy less feed.")
+            risk_seed = int(r[3].number_input("Seed", min_value=0, value=1, step=1))
+            if st.checkbox("Run risk simulation"):
+                settings = (risk_scenarios, price_swing, risk_forage, risk_seed)
+                risks = farm_plan.setdefault("risk", {})
+                if settings not in risks:
+                    risks[settings] = simulate_plan_risk(
+                        st.session_state.farm_groups, prices, bag_size, scenarios=risk_scenarios,
+                        seed=risk_seed, price_volatility=price_swing / 100, forage=risk_forage,
+                    )
+                risk = risks[settings]
+                st.dataframe(
+                    risk["summary"].reset_index().style.format({
+                        "Plan cost": "{:,.2f}", "Cost per animal": "{:,.2f}", "Animals left": "{:,.0f}",
+                    }),
+                    use_container_width=True, hide_index=True,
+                )
+                st.caption(
+                    f"P10: 1 season in 10 costs less than this. P90: 1 in 10 costs more. "
+                    f"Plan cost without risk: {total_cost:,.2f} {currency}."
+                )
+                counts, edges = np.histogram(risk["cost"], bins=40)
+                st.bar_chart(pd.DataFrame({"Seasons": counts}, index=pd.Index(edges[:-1].round(0), name="Plan cost")), height=220)
+
+        st.subheader("🕒 Feeding Schedule")
+        st.dataframe(
+            farm_frame(farm_plan, "schedule").style.format({"Kg per feeding": "{:.2f}"}),
+            use_container_width=True, hide_index=True,
+        )
 
         d = st.columns([0.33, 0.33, 0.34])
         d[0].download_button(
-            "📥 Download Excel", data=excel_file,
+            "📥 Download Excel", data=export_on_demand(farm_plan, "excel", farm_excel),
             file_name="farm_feed_plan.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True,
+            on_click="ignore", use_container_width=True,
         )
         d[1].download_button(
-            "📄 Download PDF", data=pdf_file,
+            "📄 Download PDF", data=export_on_demand(farm_plan, ("pdf", currency), farm_pdf, currency),
             file_name="farm_feed_plan.pdf", mime="application/pdf",
-            use_container_width=True,
+            on_click="ignore", use_container_width=True,
+        )
+        data_format = d[2].selectbox(
+            "Data format", ["Parquet", "Arrow", "CSV (gzip)"], label_visibility="collapsed",
+            help="One file per sheet in a zip, for spreadsheets and data tools.",
         )
-        if d[2].button("🗑️ Clear Farm Plan", use_container_width=True):
+        table_format = {"Parquet": "parquet", "Arrow": "arrow", "CSV (gzip)": "csv.gz"}[data_format]
+        d[2].download_button(
+            f"🗂️ Download {data_format}", data=export_on_demand(farm_plan, table_format, farm_archive, table_format),
+            file_name=f"farm_feed_plan_{table_format.replace('.', '_')}.zip", mime="application/zip",
+            on_click="ignore", use_container_width=True,
+        )
+        if st.button("🗑️ Clear Farm Plan"):
+            storage.clear_groups(farm_db, st.session_state.farm_name)
             st.session_state.farm_groups = []
+            st.session_state.farm_plan = None
             st.rerun()
 
 
+with tab_network:
+    st.subheader("🌍 Farm Network")
+    st.markdown(
+        "<div class='small-note'>Plans every saved farm with today's prices and bag size, "
+        "then adds them up by region. Set each farm's region in the menu.</div>",
+        unsafe_allow_html=True,
+    )
+    if st.button("🔄 Plan all farms", type="primary"):
+        st.session_state.network = plan_network(
+            storage.load_all_groups(farm_db), prices, bag_size,
+            regions={farm: region for farm, region in storage.list_farms(farm_db) if region},
+        )
+    network = st.session_state.get("network")
+    if network is None:
+        st.info("Press Plan all farms to build the network plan.")
+    elif network["farms"].empty:
+        st.info("No farm has any groups yet.")
+    else:
+        region_totals = network["region_totals"]
+        n = st.columns(4)
+        n[0].metric("Farms", f"{region_totals['Farms'].sum():,}")
+        n[1].metric("Groups", f"{region_totals['Groups'].sum():,}")
+        n[2].metric("Bags to order", f"{region_totals['Bags to order'].sum():,}")
+        n[3].metric("Plan cost", f"{region_totals['Plan cost'].sum():,.2f} {currency}")
+
+        money = {"Daily kg": "{:,.2f}", "Plan kg": "{:,.1f}", "Plan cost": "{:,.2f}"}
+        st.dataframe(region_totals.style.format(money), use_container_width=True, hide_index=True)
+
+        region = st.selectbox("Region", region_totals["Region"])
+        st.markdown(f"**🛒 {region} — bag order**")
+        st.dataframe(
+            network["regions"][network["regions"]["Region"] == region].drop(columns="Region").style.format(money),
+            use_container_width=True, hide_index=True,
+        )
+        region_farms = network["farms"][network["farms"]["Region"] == region]
+        st.markdown(f"**🚜 Farms in {region}**")
+        st.dataframe(region_farms.drop(columns="Region").style.format(money), use_container_width=True, hide_index=True)
+
+        network_farm = st.selectbox("Farm", region_farms["Farm"])
+        network_farm_feed = network["feed"][network["feed"]["Farm"] == network_farm]
+        st.markdown(f"**🐾 {network_farm} — groups**")
+        st.dataframe(
+            network_farm_feed[["Group", "Animal", "Stage", "Ingredient", "Daily kg", "Plan kg", "Bags needed", "Plan cost"]]
+            .style.format(dict(money, **{"Bags needed": "{:.2f}"})),
+            use_container_width=True, hide_index=True,
+        )
+
+        st.download_button(
+            "📥 Download network Excel", data=export_on_demand(network, "excel", network_excel),
+            file_name="farm_network_plan.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            on_click="ignore",
+        )
+
+
 with tab_reference:
     st.subheader("📖 Feed Guide")
     st.markdown(
@@ -1308,6 +1253,7 @@ with tab_reference:
                     f"{stage_data['feedings']} feeding(s) daily."
                 )
                 st.caption(ration_text)
+                st.caption(format_nutrients(stage_nutrients(animal_name, stage_name)))
                 st.write(stage_data["guidance"])
 
     st.warning(
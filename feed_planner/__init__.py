@@ -0,0 +1,119 @@
+from . import data
+from .catalogue import (
+    build_catalogue,
+    catalogue_version,
+    current_catalogue,
+    reload_catalogue,
+    reload_catalogue_if_changed,
+    stage_profile,
+)
+from .charts import feed_mix_png, ingredient_totals
+from .cohorts import cohort_calendar
+from .currencies import currency_catalogue, get_currencies
+from .exports import TABLE_FORMATS, dataframe_to_excel, dataframes_to_archive, generate_pdf_report, write_table
+from .importer import group_from_record, import_groups
+from .inventory import STOCK_EVENT_KINDS, record_stock_event, stock_projection, stock_status
+from .lifecycle import lifecycle_curve, lifecycle_curves, lifetime_cost_grid, simulate_lifecycle
+from .network import network_rollup, plan_network
+from .nutrients import (
+    NUTRIENT_LABELS,
+    NUTRIENTS,
+    ration_nutrient_vector,
+    ration_nutrients,
+    stage_nutrient_vector,
+    stage_nutrients,
+)
+from .optimizer import least_cost_ration, least_cost_rations, nutrient_limits
+from .planning import (
+    add_costs,
+    build_farm_plan,
+    build_schedule,
+    calculate_farm_plan,
+    calculate_group_plan,
+    concat_plan_frames,
+    merge_ingredient_summaries,
+    normalize_ration,
+    plan_sheets,
+    profile_for,
+    summarize_ingredients,
+)
+from .procurement import OFFER_LABELS, offers_from_prices, procurement_plan
+from .risk import simulate_plan_risk
+
+__all__ = [
+    "CATALOGUE",
+    "CUSTOM_INGREDIENTS",
+    "FEEDING_WINDOWS",
+    "LIFECYCLE",
+    "LIVESTOCK_DATA",
+    "NUTRIENTS",
+    "NUTRIENT_LABELS",
+    "NUTRIENT_MATRIX",
+    "OFFER_LABELS",
+    "STAGE_NUTRIENTS",
+    "STOCK_EVENT_KINDS",
+    "TABLE_FORMATS",
+    "add_costs",
+    "build_catalogue",
+    "build_farm_plan",
+    "catalogue_version",
+    "build_schedule",
+    "calculate_farm_plan",
+    "calculate_group_plan",
+    "concat_plan_frames",
+    "current_catalogue",
+    "cohort_calendar",
+    "currency_catalogue",
+    "dataframe_to_excel",
+    "dataframes_to_archive",
+    "feed_mix_png",
+    "generate_pdf_report",
+    "get_currencies",
+    "group_from_record",
+    "import_groups",
+    "ingredient_totals",
+    "least_cost_ration",
+    "least_cost_rations",
+    "lifecycle_curve",
+    "lifecycle_curves",
+    "lifetime_cost_grid",
+    "merge_ingredient_summaries",
+    "normalize_ration",
+    "network_rollup",
+    "nutrient_limits",
+    "offers_from_prices",
+    "plan_network",
+    "plan_sheets",
+    "procurement_plan",
+    "profile_for",
+    "ration_nutrient_vector",
+    "ration_nutrients",
+    "record_stock_event",
+    "reload_catalogue",
+    "reload_catalogue_if_changed",
+    "simulate_lifecycle",
+    "simulate_plan_risk",
+    "stage_nutrient_vector",
+    "stage_nutrients",
+    "stage_profile",
+    "stock_projection",
+    "stock_status",
+    "summarize_ingredients",
+    "write_table",
+]
+
+
+def __getattr__(name):
+    # The catalogue and its tables are replaced as a whole when the catalogue
+    # file is reloaded, so they are looked up each time instead of copied.
+    # Code that reads several of them should take current_catalogue() once.
+    if name == "CATALOGUE":
+        return current_catalogue()
+    if name in data.TABLE_NAMES:
+        return getattr(current_catalogue(), data.TABLE_NAMES[name])
+    if name == "NUTRIENT_MATRIX":
+        return current_catalogue().nutrient_matrix
+    if name == "STAGE_NUTRIENTS":
+        catalogue = current_catalogue()
+        return {(profile.animal, profile.stage): catalogue.stage_nutrients[profile.id] for profile in catalogue.stages}
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,250 @@
+import argparse
+import asyncio
+import json
+import math
+import signal
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+from .catalogue import catalogue_version, current_catalogue, reload_catalogue_if_changed
+from .importer import group_from_record
+from .lifecycle import MAX_DAYS_TO_SALE, MIN_DAYS_TO_SALE, lifetime_cost_grid
+from .planning import build_farm_plan, farm_plan_rows, group_schedule_rows
+
+# Requests with up to INLINE_GROUPS groups are answered on the event loop in
+# plain Python; bigger batches go to the worker processes so one large farm
+# never holds up the small requests queued behind it.
+INLINE_GROUPS = 20
+MAX_BODY_BYTES = 8 * 2**20
+DEFAULT_BAG_SIZE = 50.0
+
+
+def request_groups(payload):
+    # Either {"groups": [...]} or a single group as the whole body.
+    records = payload["groups"] if "groups" in payload else [payload]
+    if not isinstance(records, list):
+        raise ValueError("groups must be a list")
+    if not records:
+        raise ValueError("groups must list at least one group")
+    if not all(isinstance(record, dict) for record in records):
+        raise ValueError("each group must be a JSON object")
+    return [group_from_record(record, number) for number, record in enumerate(records, start=1)]
+
+
+def request_prices(payload):
+    prices = payload.get("prices") or {}
+    if not isinstance(prices, dict):
+        raise ValueError("prices must be an object of ingredient: price per bag")
+    bag_size = payload.get("bag_size")
+    bag_size = DEFAULT_BAG_SIZE if bag_size is None else request_number(bag_size, "bag_size")
+    if not 0 < bag_size < math.inf:
+        raise ValueError("bag_size must be a number above 0")
+    prices = {ingredient: request_number(price, f"price of {ingredient}") for ingredient, price in prices.items()}
+    if not all(math.isfinite(price) for price in prices.values()):
+        raise ValueError("prices must be finite numbers")
+    return prices, bag_size
+
+
+def request_number(value, field):
+    # float() would take true as 1.0.
+    if isinstance(value, bool):
+        raise ValueError(f"{field} must be a number, got {json.dumps(value)}")
+    return float(value)
+
+
+def reject_constant(name):
+    # json.loads accepts NaN and Infinity, which the answer could not carry
+    # back as valid JSON.
+    raise ValueError(f"{name} is not a valid JSON number")
+
+
+def plan_response(feed, summary):
+    return {"feed": feed, "summary": summary, "total_cost": sum(row["Plan cost"] for row in summary)}
+
+
+def batch_plan(groups, prices, bag_size):
+    # Runs in a worker process for large requests, which watches the
+    # catalogue file for itself.
+    reload_catalogue_if_changed()
+    plan = build_farm_plan(groups, prices, bag_size)
+    return plan_response(plan["feed"].to_dict("records"), plan["summary"].to_dict("records"))
+
+
+def batch_schedule(groups):
+    reload_catalogue_if_changed()
+    return {"schedule": [row for group in groups for row in group_schedule_rows(group)]}
+
+
+async def plan_endpoint(payload, executor):
+    groups = request_groups(payload)
+    prices, bag_size = request_prices(payload)
+    if len(groups) > INLINE_GROUPS:
+        return await asyncio.get_running_loop().run_in_executor(executor, batch_plan, groups, prices, bag_size)
+    return plan_response(*farm_plan_rows(groups, prices, bag_size))
+
+
+async def schedule_endpoint(payload, executor):
+    groups = request_groups(payload)
+    if len(groups) > INLINE_GROUPS:
+        return await asyncio.get_running_loop().run_in_executor(executor, batch_schedule, groups)
+    return batch_schedule(groups)
+
+
+async def lifetime_cost_endpoint(payload, executor):
+    animal = payload.get("animal")
+    lifecycles = current_catalogue().lifecycle
+    if animal not in lifecycles:
+        raise ValueError(f"animal must be one of {', '.join(lifecycles)}")
+    lifecycle = lifecycles[animal]
+    count = int(payload.get("count") or 0)
+    # The app's range; the lifecycle curves hold a value per day.
+    days_to_sale = payload.get("days_to_sale")
+    days_to_sale = lifecycle["days_to_sale"] if days_to_sale is None else int(request_number(days_to_sale, "days_to_sale"))
+    if not MIN_DAYS_TO_SALE <= days_to_sale <= MAX_DAYS_TO_SALE:
+        raise ValueError(f"days_to_sale must be between {MIN_DAYS_TO_SALE} and {MAX_DAYS_TO_SALE}")
+    forage_pct = float(payload.get("forage_pct", lifecycle["forage_offset_default"]))
+    stock_price = float(payload.get("stock_price") or 0.0)
+    if count <= 0 or not 0 <= forage_pct <= 100 or not math.isfinite(stock_price):
+        raise ValueError("count must be above 0, forage_pct between 0 and 100 and stock_price a finite number")
+    prices, bag_size = request_prices(payload)
+
+    grid = lifetime_cost_grid(animal, count, prices, bag_size, [stock_price], [forage_pct], [days_to_sale])
+    total_cost = float(grid["total_cost"][0, 0, 0])
+    stock_cost = stock_price * count
+    return {
+        "animal": animal,
+        "count": count,
+        "days_to_sale": days_to_sale,
+        "forage_pct": forage_pct,
+        "feed_kg": float(grid["feed_kg"][0, 0]),
+        "feed_cost": total_cost - stock_cost,
+        "stock_cost": stock_cost,
+        "total_cost": total_cost,
+        "cost_per_animal": total_cost / count,
+        "expected_at_sale": count * (1 - lifecycle["mortality_pct"] / 100),
+    }
+
+
+async def health_endpoint(payload, executor):
+    return {"status": "ok", "catalogue_version": catalogue_version()[0]}
+
+
+ROUTES = {
+    ("POST", "/plan"): plan_endpoint,
+    ("POST", "/schedule"): schedule_endpoint,
+    ("POST", "/lifetime-cost"): lifetime_cost_endpoint,
+    ("GET", "/health"): health_endpoint,
+}
+
+
+async def dispatch(method, path, body, executor):
+    route = ROUTES.get((method, path))
+    if route is None:
+        if any(route_path == path for _, route_path in ROUTES):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} is not allowed on {path}"}
+        return HTTPStatus.NOT_FOUND, {"error": f"No endpoint at {path}"}
+    reload_catalogue_if_changed()
+    try:
+        payload = json.loads(body, parse_constant=reject_constant) if body else {}
+        if not isinstance(payload, dict):
+            raise ValueError("the request body must be a JSON object")
+        return HTTPStatus.OK, await route(payload, executor)
+    except json.JSONDecodeError as error:
+        return HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON: {error.msg}"}
+    except (ValueError, TypeError, OverflowError) as error:
+        return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+    except Exception as error:
+        # Anything else is a bug, but the client still gets an answer and
+        # the connection stays usable.
+        traceback.print_exc(file=sys.stderr)
+        return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Internal error: {type(error).__name__}"}
+
+
+def http_response(status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def handle_connection(reader, writer, executor):
+    # A small HTTP/1.1 server: one request at a time per connection, with
+    # keep-alive so clients can reuse connections.
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            parts = request_line.decode("latin-1").split()
+            if len(parts) != 3:
+                writer.write(http_response(HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}, False))
+                break
+            method, path, version = parts
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            length = headers.get("content-length") or "0"
+            if not length.isdigit():
+                writer.write(http_response(HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}, False))
+                break
+            length = int(length)
+            if length > MAX_BODY_BYTES:
+                writer.write(http_response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request body too large"}, False))
+                break
+            body = await reader.readexactly(length) if length else b""
+            status, payload = await dispatch(method, path.split("?", 1)[0], body, executor)
+            writer.write(http_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        # ValueError: a header line longer than the stream limit.
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=8080, workers=None):
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        server = await asyncio.start_server(
+            lambda reader, writer: handle_connection(reader, writer, executor), host, port,
+        )
+        # Stop cleanly on SIGTERM too, so the worker processes are shut down
+        # with the server rather than left behind.
+        stopped = asyncio.Event()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopped.set)
+        except (NotImplementedError, AttributeError):
+            pass
+        print(f"Feed planner API on http://{host}:{port}", file=sys.stderr, flush=True)
+        async with server:
+            await stopped.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m feed_planner.api", description="Serve feed plans over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080).")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for large batches (default: CPU count).")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
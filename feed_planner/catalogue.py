@@ -0,0 +1,295 @@
+import re
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import numpy as np
+
+from . import data
+from .data import NUTRIENTS
+
+# The catalogue file checked once and frozen into records with integer IDs,
+# so planning code indexes arrays instead of re-reading and re-normalising
+# the nested dicts for every group on every rerun.
+#
+# Everything read from the file, or worked out from it, hangs off one
+# Catalogue object. A reload builds a complete new one and publishes it with
+# a single assignment to CATALOGUE, so code that takes current_catalogue()
+# once per call never sees half of an old catalogue and half of a new one.
+# The file is first read when the catalogue is first asked for, so worker
+# processes can be handed their parent's catalogue instead (use_catalogue).
+
+FEEDING_TIME = re.compile(r"([01]\d|2[0-3]):[0-5]\d")
+# How often reload_catalogue_if_changed looks at the catalogue file.
+CHECK_INTERVAL = 1.0
+
+
+def frozen_array(values, dtype):
+    array = np.array(values, dtype=dtype)
+    array.setflags(write=False)
+    return array
+
+
+@dataclass(frozen=True, slots=True)
+class StageProfile:
+    id: int
+    animal: str
+    stage: str
+    unit: str
+    daily_kg: float
+    feedings: int
+    feeding_times: tuple
+    # Ration percentages as listed, and the same ration as shares adding up
+    # to 1 (in listed order and as a vector over CUSTOM_INGREDIENTS).
+    ration: MappingProxyType
+    shares: MappingProxyType
+    ingredient_ids: np.ndarray
+    share_vector: np.ndarray
+    guidance: str
+
+    def __getitem__(self, key):
+        # profile["daily_kg"] keeps working where a stage used to be a dict.
+        return getattr(self, key)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Catalogue:
+    version: str
+    stamp: tuple
+    # The file's tables as read, shared by every caller: never modify them.
+    livestock: dict
+    lifecycle: dict
+    ingredients: list
+    composition: dict
+    feeding_windows: dict
+    stages: tuple
+    stage_ids: MappingProxyType
+    ingredient_ids: MappingProxyType
+    # Per stage ID: kg per animal per day, feedings per day and the ration
+    # as shares of every ingredient (stages x ingredients).
+    daily_kg: np.ndarray
+    feedings: np.ndarray
+    shares: np.ndarray
+    # ingredients x NUTRIENTS, and every stage's ration in NUTRIENTS.
+    nutrient_matrix: np.ndarray
+    stage_nutrients: np.ndarray
+
+    def profile(self, animal, stage):
+        return self.stages[self.stage_ids[(animal, stage)]]
+
+    def tables(self):
+        # The tables this catalogue was built from, for build_catalogue.
+        return {
+            "version": self.version,
+            "ingredients": self.ingredients,
+            "composition": self.composition,
+            "feeding_windows": self.feeding_windows,
+            "livestock": self.livestock,
+            "lifecycle": self.lifecycle,
+        }
+
+
+def check_feeding_windows(feeding_windows):
+    for feedings, times in feeding_windows.items():
+        if len(times) != feedings:
+            raise ValueError(f"feeding window for {feedings} feedings lists {len(times)} times")
+        if not all(FEEDING_TIME.fullmatch(time) for time in times) or list(times) != sorted(set(times)):
+            raise ValueError(f"feeding window for {feedings} feedings must be increasing HH:MM times, got {times}")
+
+
+def stage_profile_record(stage_id, animal, unit, stage, profile, ingredient_ids, feeding_windows):
+    where = f"{animal} / {stage}"
+    daily_kg = profile["daily_kg"]
+    if not daily_kg > 0:
+        raise ValueError(f"{where}: daily_kg must be above 0, got {daily_kg!r}")
+    if profile["feedings"] not in feeding_windows:
+        raise ValueError(f"{where}: no feeding window for {profile['feedings']} feedings a day")
+    ration = profile["ration"]
+    unknown = sorted(set(ration) - set(ingredient_ids))
+    if unknown:
+        raise ValueError(f"{where}: unknown ingredient(s) in ration: {', '.join(unknown)}")
+    if min(ration.values(), default=0) < 0 or sum(ration.values()) <= 0:
+        raise ValueError(f"{where}: ration percentages must be 0 or more and add up to more than 0")
+
+    total = sum(ration.values())
+    shares = {ingredient: percentage / total for ingredient, percentage in ration.items()}
+    share_vector = np.zeros(len(ingredient_ids))
+    share_vector[[ingredient_ids[ingredient] for ingredient in shares]] = list(shares.values())
+    share_vector.setflags(write=False)
+    return StageProfile(
+        id=stage_id,
+        animal=animal,
+        stage=stage,
+        unit=unit,
+        daily_kg=float(daily_kg),
+        feedings=int(profile["feedings"]),
+        feeding_times=tuple(feeding_windows[profile["feedings"]]),
+        ration=MappingProxyType(dict(ration)),
+        shares=MappingProxyType(shares),
+        ingredient_ids=frozen_array([ingredient_ids[ingredient] for ingredient in shares], np.intp),
+        share_vector=share_vector,
+        guidance=profile.get("guidance", ""),
+    )
+
+
+def check_composition(composition, ingredients):
+    for ingredient in ingredients:
+        values = composition.get(ingredient, {})
+        missing = [nutrient for nutrient in NUTRIENTS if nutrient not in values]
+        if missing:
+            raise ValueError(f"{ingredient}: no value for {', '.join(missing)}")
+        if not all(isinstance(values[nutrient], (int, float)) and values[nutrient] >= 0 for nutrient in NUTRIENTS):
+            raise ValueError(f"{ingredient}: nutrient values must be numbers of 0 or more")
+
+
+def check_lifecycle(lifecycle, livestock_data):
+    for animal, plan in lifecycle.items():
+        if animal not in livestock_data:
+            raise ValueError(f"lifecycle for unknown animal {animal!r}")
+        if not plan["days_to_sale"] > 0 or not plan["avg_daily_kg"] > 0:
+            raise ValueError(f"{animal}: days_to_sale and avg_daily_kg must be above 0")
+        if not plan["stages"] or plan["stages"][-1][1] is not None:
+            raise ValueError(f"{animal}: the last lifecycle stage must run until sale (days null)")
+        for stage, days in plan["stages"]:
+            if stage not in livestock_data[animal]["stages"]:
+                raise ValueError(f"{animal}: unknown lifecycle stage {stage!r}")
+            if days is not None and not days > 0:
+                raise ValueError(f"{animal} / {stage}: lifecycle days must be above 0")
+
+
+def build_catalogue(tables, stamp=None):
+    # ``tables`` as returned by data.catalogue_tables. Raises ValueError
+    # naming the section, animal or stage if anything is off.
+    livestock, ingredients = tables["livestock"], tables["ingredients"]
+    feeding_windows = tables["feeding_windows"]
+    check_feeding_windows(feeding_windows)
+    check_composition(tables["composition"], ingredients)
+    check_lifecycle(tables["lifecycle"], livestock)
+    ingredient_ids = {ingredient: index for index, ingredient in enumerate(ingredients)}
+    stages = tuple(
+        stage_profile_record(stage_id, animal, animal_data["unit"], stage, profile, ingredient_ids, feeding_windows)
+        for stage_id, (animal, animal_data, stage, profile) in enumerate(
+            (animal, animal_data, stage, profile)
+            for animal, animal_data in livestock.items()
+            for stage, profile in animal_data["stages"].items()
+        )
+    )
+    shares = np.vstack([profile.share_vector for profile in stages]) if stages else np.zeros((0, len(ingredients)))
+    shares.setflags(write=False)
+    nutrient_matrix = frozen_array(
+        [[tables["composition"][ingredient][nutrient] for nutrient in NUTRIENTS] for ingredient in ingredients], float,
+    ).reshape(len(ingredients), len(NUTRIENTS))
+    stage_nutrients = shares @ nutrient_matrix
+    stage_nutrients.setflags(write=False)
+    return Catalogue(
+        version=tables["version"],
+        stamp=stamp,
+        livestock=livestock,
+        lifecycle=tables["lifecycle"],
+        ingredients=ingredients,
+        composition=tables["composition"],
+        feeding_windows=feeding_windows,
+        stages=stages,
+        stage_ids=MappingProxyType({(profile.animal, profile.stage): profile.id for profile in stages}),
+        ingredient_ids=MappingProxyType(ingredient_ids),
+        daily_kg=frozen_array([profile.daily_kg for profile in stages], float),
+        feedings=frozen_array([profile.feedings for profile in stages], np.int8),
+        shares=shares,
+        nutrient_matrix=nutrient_matrix,
+        stage_nutrients=stage_nutrients,
+    )
+
+
+CATALOGUE = None
+
+# "error" holds why the last reload was refused, if it was, and "refused"
+# the stamp of the file that was refused.
+RELOAD_STATE = {"checked": time.monotonic(), "error": None, "refused": None}
+RELOAD_LOCK = threading.Lock()
+
+
+def current_catalogue():
+    global CATALOGUE
+    catalogue = CATALOGUE
+    if catalogue is None:
+        with RELOAD_LOCK:
+            if CATALOGUE is None:
+                CATALOGUE = build_catalogue(*data.read_catalogue())
+            catalogue = CATALOGUE
+    return catalogue
+
+
+def use_catalogue(tables, stamp):
+    # Worker pool initializer: plan with the parent's catalogue, whatever the
+    # file on disk says now (it may have been edited, or be broken).
+    global CATALOGUE
+    with RELOAD_LOCK:
+        CATALOGUE = build_catalogue(tables, stamp)
+
+
+def worker_initializer():
+    # initializer and initargs for a ProcessPoolExecutor whose workers
+    # should plan with this process's current catalogue.
+    catalogue = current_catalogue()
+    return {"initializer": use_catalogue, "initargs": (catalogue.tables(), catalogue.stamp)}
+
+
+def reload_catalogue(path=None):
+    # Reads the catalogue file again and, if every check passes, swaps it in
+    # for the whole process. On any error the current catalogue stays and
+    # the error is raised.
+    global CATALOGUE
+    path = path or data.CATALOGUE_FILE
+    with RELOAD_LOCK:
+        try:
+            catalogue = build_catalogue(*data.read_catalogue(path))
+        except (OSError, ValueError) as error:
+            RELOAD_STATE["error"] = f"{path}: {error}"
+            raise
+        CATALOGUE = catalogue
+        RELOAD_STATE["error"] = RELOAD_STATE["refused"] = None
+    return catalogue_version()
+
+
+def reload_catalogue_if_changed():
+    # Cheap enough to call on every request: at most one stat() a second.
+    # Returns True when a new catalogue was loaded.
+    now = time.monotonic()
+    if now - RELOAD_STATE["checked"] < CHECK_INTERVAL:
+        return False
+    RELOAD_STATE["checked"] = now
+    try:
+        stamp = data.file_stamp(data.CATALOGUE_FILE)
+    except OSError as error:
+        RELOAD_STATE["error"] = f"{data.CATALOGUE_FILE}: {error}"
+        return False
+    if stamp in (current_catalogue().stamp, RELOAD_STATE["refused"]):
+        return False
+    try:
+        reload_catalogue()
+    except (OSError, ValueError):
+        # Keep planning with the last good catalogue until the file is fixed,
+        # without re-reading the broken file on every check.
+        RELOAD_STATE["refused"] = stamp
+        return False
+    return True
+
+
+def catalogue_version():
+    # Changes whenever a different catalogue is loaded; plan caches key on it.
+    catalogue = current_catalogue()
+    return catalogue.version, catalogue.stamp
+
+
+def stage_id(animal, stage):
+    return current_catalogue().stage_ids[(animal, stage)]
+
+
+def stage_ids(groups, catalogue=None):
+    ids = (catalogue or current_catalogue()).stage_ids
+    return np.array([ids[(group["animal"], group["stage"])] for group in groups], dtype=np.intp)
+
+
+def stage_profile(animal, stage):
+    return current_catalogue().profile(animal, stage)
@@ -0,0 +1,36 @@
+from io import BytesIO
+
+# matplotlib is imported inside feed_mix_png so that importing feed_planner
+# for planning alone stays fast.
+
+FEED_MIX_COLOR = "#3f7d58"
+
+
+def ingredient_totals(feed_df):
+    # Plan kg per ingredient, largest first.
+    return feed_df.groupby("Ingredient", observed=True)["Plan kg"].sum().sort_values(ascending=False)
+
+
+def feed_mix_png(totals, dpi=150):
+    # ``totals`` are (ingredient, kg) pairs. The figure is built without
+    # pyplot, so nothing is left in pyplot's figure registry and the figure
+    # is freed as soon as the PNG is written.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    ingredients = [ingredient for ingredient, _ in totals]
+    kg = [value for _, value in totals]
+    fig = Figure(figsize=(8, 4.5))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    ax.bar(ingredients, kg, color=FEED_MIX_COLOR)
+    ax.set_ylabel("Kg for plan")
+    ax.set_xlabel("")
+    ax.tick_params(axis="x", rotation=35)
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    fig.tight_layout()
+    output = BytesIO()
+    fig.savefig(output, format="png", dpi=dpi)
+    fig.clear()
+    return output.getvalue()
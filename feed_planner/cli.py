@@ -0,0 +1,149 @@
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from .cohorts import cohort_calendar
+from .exports import TABLE_FORMATS, dataframe_to_excel, generate_pdf_report, write_table
+from .importer import group_from_record
+from .planning import build_farm_plan, plan_sheets
+
+GROUP_FILE_SUFFIXES = (".csv", ".json")
+OUTPUT_FORMATS = ("xlsx", "pdf", "csv", *TABLE_FORMATS)
+DEFAULT_FORMATS = ("xlsx", "pdf", "csv")
+
+
+def read_records(path):
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        return json.loads(path.read_text(encoding="utf-8"))
+    return pd.read_csv(path, dtype=str, keep_default_na=False).to_dict("records")
+
+
+def read_groups(path, default_days=30):
+    records = read_records(path)
+    if isinstance(records, dict):
+        records = records.get("groups", [])
+
+    groups = []
+    for number, record in enumerate(records, start=1):
+        try:
+            groups.append(group_from_record(record, number, default_days))
+        except ValueError as error:
+            raise ValueError(f"group {number}: {error}") from None
+    return groups
+
+
+def read_prices(path):
+    if path is None:
+        return {}
+    records = read_records(path)
+    if isinstance(records, dict):
+        return {ingredient: float(price) for ingredient, price in records.items()}
+    return {record["ingredient"]: float(record["price"] or 0.0) for record in records}
+
+
+def plan_farm_file(path, prices, bag_size, currency, output_dir, formats, default_days=30):
+    path = Path(path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    groups = read_groups(path, default_days)
+    plan = build_farm_plan(groups, prices, bag_size)
+    if any(group["start"] for group in groups):
+        plan["calendar"] = cohort_calendar(groups, bag_size)
+    sheets = plan_sheets(plan)
+    written = []
+
+    if "xlsx" in formats:
+        target = output_dir / f"{path.stem}_plan.xlsx"
+        target.write_bytes(dataframe_to_excel(sheets))
+        written.append(target)
+    if "pdf" in formats:
+        target = output_dir / f"{path.stem}_plan.pdf"
+        total_cost = plan["summary"]["Plan cost"].sum()
+        generate_pdf_report(plan["feed"], plan["schedule"], currency, total_cost, output=str(target))
+        written.append(target)
+    if "csv" in formats:
+        for sheet_name, dataframe in sheets.items():
+            target = output_dir / f"{path.stem}_{sheet_name.lower().replace(' ', '_')}.csv"
+            dataframe.to_csv(target, index=False)
+            written.append(target)
+    for table_format, suffix in TABLE_FORMATS.items():
+        if table_format in formats:
+            for sheet_name, dataframe in sheets.items():
+                target = output_dir / f"{path.stem}_{sheet_name.lower().replace(' ', '_')}{suffix}"
+                write_table(dataframe, table_format, str(target))
+                written.append(target)
+    return written
+
+
+def collect_group_files(inputs, exclude=None):
+    exclude = Path(exclude).resolve() if exclude else None
+    files = []
+    for item in map(Path, inputs):
+        candidates = sorted(item.iterdir()) if item.is_dir() else [item]
+        files.extend(
+            candidate for candidate in candidates
+            if candidate.suffix.lower() in GROUP_FILE_SUFFIXES and candidate.resolve() != exclude
+        )
+    return files
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m feed_planner",
+        description="Build farm feed plans from group files without the Streamlit app.",
+    )
+    parser.add_argument("inputs", nargs="+", help="CSV/JSON group files or directories of them.")
+    parser.add_argument("--prices", help="CSV (ingredient,price) or JSON price list, per bag.")
+    parser.add_argument("--bag-size", type=float, default=50.0, help="Bag size in kg (default: 50).")
+    parser.add_argument("--currency", default="ZMW", help="Currency label for reports (default: ZMW).")
+    parser.add_argument("--days", type=int, default=30, help="Plan length for groups without days.")
+    parser.add_argument("--output-dir", default="plans", help="Where to write outputs (default: plans).")
+    parser.add_argument(
+        "--format", dest="formats", action="append", choices=OUTPUT_FORMATS,
+        help="Output format; repeat for several (default: xlsx, pdf and csv).",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    formats = tuple(args.formats or DEFAULT_FORMATS)
+    prices = read_prices(args.prices)
+    files = collect_group_files(args.inputs, exclude=args.prices)
+    if not files:
+        print("No CSV or JSON group files found.", file=sys.stderr)
+        return 1
+
+    plan_args = (prices, args.bag_size, args.currency, args.output_dir, formats, args.days)
+    failures = 0
+
+    if args.workers == 1 or len(files) == 1:
+        for path in files:
+            try:
+                plan_farm_file(path, *plan_args)
+            except Exception as error:
+                failures += 1
+                print(f"{path}: {error!r}", file=sys.stderr)
+            else:
+                print(f"{path}: done")
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {executor.submit(plan_farm_file, path, *plan_args): path for path in files}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    future.result()
+                except Exception as error:
+                    failures += 1
+                    print(f"{path}: {error!r}", file=sys.stderr)
+                else:
+                    print(f"{path}: done")
+
+    print(f"Planned {len(files) - failures} of {len(files)} farm file(s) into {args.output_dir}")
+    return 1 if failures else 0
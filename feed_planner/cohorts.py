@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from .catalogue import current_catalogue
+from .planning import ingredient_rates
+
+
+def cohort_calendar(groups, bag_size, default_start=None, week_start="MON"):
+    # Daily and weekly ingredient demand for groups that start on different
+    # dates. Each group feeds at a constant rate over [start, start + days),
+    # so demand is swept onto the calendar with one difference array:
+    # +rate on the start day, -rate on the day after the last, then a
+    # cumulative sum. Groups without a start begin on ``default_start``
+    # (today by default).
+    default_start = pd.Timestamp(default_start or pd.Timestamp.today()).normalize()
+    starts = pd.DatetimeIndex([
+        pd.Timestamp(group.get("start") or default_start) for group in groups
+    ]).normalize()
+    days = np.array([int(group["days"]) for group in groups], dtype=int)
+    catalogue = current_catalogue()
+    rates = ingredient_rates(groups, catalogue)
+
+    origin = starts.min() if len(groups) else default_start
+    first_day = np.asarray((starts - origin).days, dtype=int)
+    last_day = first_day + days
+    horizon = int(last_day.max()) if len(groups) else 0
+
+    demand = np.zeros((horizon + 1, len(catalogue.ingredients)))
+    np.add.at(demand, first_day, rates)
+    np.add.at(demand, last_day, -rates)
+    active = np.zeros(horizon + 1)
+    np.add.at(active, first_day, 1)
+    np.add.at(active, last_day, -1)
+    demand = np.cumsum(demand, axis=0)[:horizon].clip(min=0)
+
+    dates = pd.date_range(origin, periods=horizon, freq="D", name="Date")
+    used = demand.any(axis=0)
+    daily = pd.DataFrame(demand[:, used], index=dates, columns=np.array(catalogue.ingredients)[used])
+    daily.insert(0, "Total kg", demand.sum(axis=1))
+    daily.insert(0, "Active groups", np.cumsum(active)[:horizon].round().astype(int))
+
+    weekly = (
+        daily.drop(columns="Active groups")
+        .resample(f"W-{week_start}", label="left", closed="left")
+        .sum()
+    )
+    weekly.index.name = "Week of"
+    # Whole bags bought each week; part bags left over carry into the next week.
+    bags_to_date = np.ceil(weekly.drop(columns="Total kg").cumsum() / bag_size - 1e-9)
+    bags = bags_to_date.diff().fillna(bags_to_date).astype(int)
+    bags.insert(0, "Total bags", bags.sum(axis=1))
+
+    peak_date = daily["Total kg"].idxmax() if horizon else None
+    return {
+        "daily": daily,
+        "weekly": weekly,
+        "bags": bags,
+        "peak_date": peak_date,
+        "peak_kg": float(daily["Total kg"].max()) if horizon else 0.0,
+    }
@@ -0,0 +1,40 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+
+COMMON_CURRENCIES = ("USD", "GBP", "EUR", "ZAR", "KES", "NGN", "GHS", "UGX", "TZS")
+
+# ISO 4217 codes taken from pycountry, so the app does not have to load
+# pycountry at all. Regenerate with write_currency_file().
+CURRENCY_FILE = Path(__file__).with_name("currencies.json")
+
+
+def pycountry_currency_codes():
+    import pycountry
+
+    return sorted({currency.alpha_3 for currency in pycountry.currencies})
+
+
+def load_currency_codes():
+    try:
+        return json.loads(CURRENCY_FILE.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return pycountry_currency_codes()
+
+
+@lru_cache(maxsize=None)
+def currency_catalogue(common=COMMON_CURRENCIES):
+    # Built once per process: the codes with ``common`` first, and each code's
+    # position for selectbox indexes.
+    common = tuple(common)
+    common_set = set(common)
+    codes = common + tuple(code for code in load_currency_codes() if code not in common_set)
+    return codes, {code: index for index, code in enumerate(codes)}
+
+
+def get_currencies():
+    return list(currency_catalogue()[0])
+
+
+def write_currency_file(path=CURRENCY_FILE):
+    Path(path).write_text(json.dumps(pycountry_currency_codes()) + "\n", encoding="utf-8")
@@ -0,0 +1,124 @@
+import json
+import os
+from pathlib import Path
+
+# The feed catalogue is read from catalogue.json next to this file, or from
+# the file named in FEED_PLANNER_CATALOGUE (.json, .toml or .yaml), so rations
+# can be updated without a redeploy. The file holds:
+#
+# version: any string; shown in the app and part of every plan cache key
+# ingredients: ingredient -> as-fed composition per nutrient (crude_protein %,
+#              energy MJ/kg, calcium %, phosphorus %, lysine %, methionine %),
+#              in the order the app lists ingredients
+# feeding_windows: feedings per day -> feeding times (HH:MM)
+# livestock: animal -> unit and stages; each stage has daily_kg per animal,
+#            feedings per day, the ration in % and guidance text
+# lifecycle: young stock to sale under free-range farming, per animal:
+#   days_to_sale: typical days from start to market weight
+#   avg_daily_kg: average daily feed consumption across the lifecycle; the
+#                 stages' daily_kg are scaled to it at days_to_sale
+#   forage_offset_default: % reduction in purchased feed because animals forage
+#   stock_label / sale_label: what you buy at the start and sell at the end
+#   stages: livestock stages in order with their length in days; the last
+#           (null, or no length, as TOML has no null) runs until sale
+#   mortality_pct: typical % of animals lost between start and sale
+#
+# The parsed file is kept as plain JSON under __pycache__ (or
+# FEED_PLANNER_CACHE_DIR), keyed by the file's modification time and size,
+# so a normal start skips parsing. JSON rather than pickle, so a file
+# planted in the cache folder can only ever be data.
+NUTRIENTS = ("crude_protein", "energy", "calcium", "phosphorus", "lysine", "methionine")
+CATALOGUE_FILE = Path(os.environ.get("FEED_PLANNER_CATALOGUE") or Path(__file__).with_name("catalogue.json"))
+CACHE_FORMAT = 2
+
+
+def parse_catalogue_file(path):
+    text = Path(path).read_text(encoding="utf-8")
+    suffix = Path(path).suffix.lower()
+    if suffix == ".toml":
+        import tomllib
+
+        return tomllib.loads(text)
+    if suffix in (".yaml", ".yml"):
+        import yaml
+
+        try:
+            return yaml.safe_load(text)
+        except yaml.YAMLError as error:
+            raise ValueError(str(error)) from None
+    return json.loads(text)
+
+
+def catalogue_tables(document):
+    # The file as the structures the planner uses. Shapes are checked here;
+    # the values are checked by catalogue.build_catalogue before use.
+    try:
+        return {
+            "version": str(document.get("version", "")),
+            "ingredients": list(document["ingredients"]),
+            "composition": {ingredient: dict(values) for ingredient, values in document["ingredients"].items()},
+            "feeding_windows": {int(feedings): list(times) for feedings, times in document["feeding_windows"].items()},
+            "livestock": {
+                animal: dict(animal_data, stages={stage: dict(profile) for stage, profile in animal_data["stages"].items()})
+                for animal, animal_data in document["livestock"].items()
+            },
+            "lifecycle": {
+                animal: dict(lifecycle, stages=[(entry[0], entry[1] if len(entry) > 1 else None) for entry in lifecycle["stages"]])
+                for animal, lifecycle in document["lifecycle"].items()
+            },
+        }
+    except (AttributeError, KeyError, TypeError, ValueError) as error:
+        raise ValueError(f"catalogue file is missing or has a malformed section: {error!r}") from None
+
+
+def file_stamp(path):
+    stat = Path(path).stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def compiled_cache_path(path):
+    folder = Path(os.environ.get("FEED_PLANNER_CACHE_DIR") or Path(path).parent / "__pycache__")
+    return folder / f"{Path(path).name}.{CACHE_FORMAT}.json"
+
+
+def read_catalogue(path=CATALOGUE_FILE):
+    # (tables, stamp) for ``path``, from the compiled cache when it matches.
+    stamp = file_stamp(path)
+    cache = compiled_cache_path(path)
+    try:
+        cached = json.loads(cache.read_text(encoding="utf-8"))
+        if cached["path"] == str(Path(path).resolve()) and tuple(cached["stamp"]) == stamp:
+            return catalogue_tables(cached["document"]), stamp
+    except (OSError, KeyError, TypeError, ValueError):
+        pass
+    document = parse_catalogue_file(path)
+    tables = catalogue_tables(document)
+    try:
+        text = json.dumps({"path": str(Path(path).resolve()), "stamp": stamp, "document": document})
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        temporary = cache.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_text(text, encoding="utf-8")
+        os.replace(temporary, cache)
+    except (OSError, TypeError, ValueError):
+        # TOML dates and the like have no JSON form; such a file is parsed on every start.
+        pass
+    return tables, stamp
+
+
+# The tables' old module-level names. They are attributes of the current
+# catalogue.CATALOGUE, which a reload replaces as a whole.
+TABLE_NAMES = {
+    "LIVESTOCK_DATA": "livestock",
+    "LIFECYCLE": "lifecycle",
+    "CUSTOM_INGREDIENTS": "ingredients",
+    "INGREDIENT_COMPOSITION": "composition",
+    "FEEDING_WINDOWS": "feeding_windows",
+}
+
+
+def __getattr__(name):
+    if name in TABLE_NAMES:
+        from .catalogue import current_catalogue
+
+        return getattr(current_catalogue(), TABLE_NAMES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
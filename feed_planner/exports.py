@@ -0,0 +1,157 @@
+import gzip
+import zipfile
+from io import BytesIO
+
+import pandas as pd
+
+# xlsxwriter, reportlab and pyarrow are imported inside the exporters so
+# that importing feed_planner for planning alone stays fast.
+
+TABLE_FORMATS = {"parquet": ".parquet", "arrow": ".arrow", "csv.gz": ".csv.gz"}
+
+
+def dataframe_to_excel(sheets):
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+        for sheet_name, dataframe in sheets.items():
+            dataframe.to_excel(writer, sheet_name=sheet_name[:31], index=False)
+    return output.getvalue()
+
+
+def write_table(dataframe, table_format, output):
+    # Writes one frame to ``output`` (a path or binary file) through an Arrow
+    # table, so the columns go to disk without a row-by-row pass.
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(dataframe, preserve_index=False)
+    if table_format == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, output, compression="zstd")
+    elif table_format == "arrow":
+        with pa.ipc.new_file(output, table.schema) as writer:
+            writer.write_table(table)
+    elif table_format == "csv.gz":
+        import pyarrow.csv as pa_csv
+
+        # gzip.open leaves a caller's file open, unlike pyarrow's stream.
+        with gzip.open(output, "wb", compresslevel=6) as stream:
+            pa_csv.write_csv(table, stream)
+    else:
+        raise ValueError(f"Unknown table format {table_format!r}; use one of {', '.join(TABLE_FORMATS)}")
+
+
+def dataframes_to_archive(sheets, table_format):
+    # One file per sheet in a zip. The files are compressed already, so they
+    # are stored as they are.
+    output = BytesIO()
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as archive:
+        for sheet_name, dataframe in sheets.items():
+            name = sheet_name.lower().replace(" ", "_") + TABLE_FORMATS[table_format]
+            with archive.open(name, "w") as member:
+                write_table(dataframe, table_format, member)
+    return output.getvalue()
+
+
+PDF_PAGE_SIZE = (612.0, 792.0)  # reportlab's letter
+PDF_TOP = PDF_PAGE_SIZE[1] - 48
+PDF_BOTTOM = 70
+PDF_LINE = 14
+PDF_COURIER_WIDTH = 0.6 * 9
+
+
+def draw_pdf_table(pdf, y, title, columns, values):
+    # columns are (header, x, align) tuples and values the matching lists of
+    # strings. Each column is written a page at a time as one text block;
+    # right-aligned columns are padded and set in Courier so they line up.
+    def start_block(y, heading):
+        pdf.setFont("Helvetica-Bold", 11)
+        pdf.drawString(40, y, heading)
+        y -= 16
+        pdf.setFont("Helvetica-Bold", 9)
+        for label, x, align in columns:
+            draw = pdf.drawRightString if align == "right" else pdf.drawString
+            draw(x, y, label)
+        return y - PDF_LINE
+
+    blocks = []
+    for (_, x, align), column in zip(columns, values):
+        column = pd.Series(column, dtype=object).astype(str)
+        if align == "right":
+            width = int(column.str.len().max()) if len(column) else 0
+            blocks.append(("Courier", x - width * PDF_COURIER_WIDTH, column.str.rjust(width).tolist()))
+        else:
+            blocks.append(("Helvetica", x, column.tolist()))
+
+    if y - 16 - 2 * PDF_LINE < PDF_BOTTOM:
+        pdf.showPage()
+        y = PDF_TOP
+    y = start_block(y, title)
+    total = len(blocks[0][2]) if blocks else 0
+    start = 0
+
+    while start < total:
+        if y < PDF_BOTTOM:
+            pdf.showPage()
+            y = start_block(PDF_TOP, f"{title} (continued)")
+        stop = min(total, start + int((y - PDF_BOTTOM) // PDF_LINE) + 1)
+        for font, x, lines in blocks:
+            text = pdf.beginText(x, y)
+            text.setFont(font, 9, PDF_LINE)
+            text.textLines(lines[start:stop])
+            pdf.drawText(text)
+        y -= (stop - start) * PDF_LINE
+        start = stop
+    return y
+
+
+def generate_pdf_report(feed_df, schedule_df, currency, total_cost, output=None):
+    # Every row is written; pages break as they fill. Pass a file path or an
+    # open binary file as ``output`` to write the report there instead of memory.
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO() if output is None else output
+    pdf = canvas.Canvas(buffer, pagesize=PDF_PAGE_SIZE)
+    y = PDF_TOP
+
+    pdf.setFont("Helvetica-Bold", 16)
+    pdf.drawString(40, y, "Farm Feed Planner")
+    y -= 22
+    pdf.setFont("Helvetica", 10)
+    pdf.drawString(40, y, "Planning guide only. Confirm final rations with a local livestock nutrition expert.")
+    y -= 30
+
+    pdf.setFont("Helvetica-Bold", 12)
+    pdf.drawString(40, y, f"Total estimated plan cost: {total_cost:,.2f} {currency}")
+    y -= 24
+
+    summary = feed_df.groupby(["Group", "Ingredient"], as_index=False, observed=True).agg({"Plan kg": "sum", "Plan cost": "sum"})
+    y = draw_pdf_table(
+        pdf, y, "Feed Requirements",
+        [("Group", 40, "left"), ("Ingredient", 250, "left"),
+         ("Plan kg", 460, "right"), (f"Plan cost ({currency})", 572, "right")],
+        [
+            summary["Group"].astype(str).str.slice(0, 38),
+            summary["Ingredient"].astype(str).str.slice(0, 30),
+            summary["Plan kg"].map("{:,.1f}".format),
+            summary["Plan cost"].map("{:,.2f}".format),
+        ],
+    )
+
+    y -= 10
+    draw_pdf_table(
+        pdf, y, "Daily Feeding Times",
+        [("Group", 40, "left"), ("Stage", 250, "left"),
+         ("Feeding time", 440, "left"), ("Kg per feeding", 572, "right")],
+        [
+            schedule_df["Group"].astype(str).str.slice(0, 38),
+            schedule_df["Stage"].astype(str).str.slice(0, 34),
+            schedule_df["Feeding time"].astype(str),
+            schedule_df["Kg per feeding"].map("{:.2f}".format),
+        ],
+    )
+
+    pdf.save()
+    if output is None:
+        buffer.seek(0)
+    return buffer
@@ -0,0 +1,171 @@
+import csv
+import io
+import json
+import math
+from datetime import date
+from itertools import islice
+from pathlib import Path
+
+import pandas as pd
+
+from .catalogue import current_catalogue
+
+# openpyxl is imported inside read_xlsx_chunks so that importing feed_planner
+# for planning alone stays fast.
+
+IMPORT_CHUNK_SIZE = 5000
+# Only the first errors are kept for the report; the rest are counted.
+MAX_REPORTED_ERRORS = 1000
+
+
+def read_csv_chunks(source, chunk_size):
+    # Every field is read as text and checked by group_from_record, so the
+    # csv module is enough and keeps only one chunk of rows in memory.
+    if isinstance(source, (str, Path)):
+        handle = open(source, newline="", encoding="utf-8-sig")
+    elif isinstance(source, io.TextIOBase):
+        handle = source
+    else:
+        handle = io.TextIOWrapper(source, newline="", encoding="utf-8-sig")
+    try:
+        reader = csv.reader(handle)
+        header = [column.strip().lower() for column in next(reader, [])]
+        while True:
+            chunk = [dict(zip(header, row)) for row in islice(reader, chunk_size)]
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        if isinstance(source, (str, Path)):
+            handle.close()
+
+
+def read_xlsx_chunks(source, chunk_size):
+    # read_only mode streams the first sheet row by row instead of loading
+    # the whole workbook.
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(column or "").strip().lower() for column in next(rows, ())]
+        while True:
+            chunk = [
+                {column: "" if value is None else value for column, value in zip(header, row)}
+                for row in islice(rows, chunk_size)
+            ]
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        workbook.close()
+
+
+def read_group_chunks(source, chunk_size=IMPORT_CHUNK_SIZE, file_name=None):
+    # ``source`` is a path or an open file; ``file_name`` gives the type of
+    # an uploaded file.
+    suffix = Path(file_name or getattr(source, "name", None) or str(source)).suffix.lower()
+    if suffix in (".xlsx", ".xlsm"):
+        return read_xlsx_chunks(source, chunk_size)
+    return read_csv_chunks(source, chunk_size)
+
+
+def whole_number(value, field):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a number, got {value!r}") from None
+    if not math.isfinite(number) or number != int(number) or number <= 0:
+        raise ValueError(f"{field} must be a whole number above 0, got {value!r}")
+    return int(number)
+
+
+def parse_ration(value, catalogue=None):
+    if value in ("", None):
+        return None
+    ration = json.loads(value) if isinstance(value, str) else value
+    if not isinstance(ration, dict) or not ration:
+        raise ValueError("ration must be a JSON object such as {\"corn\": 60, \"soybean meal\": 40}")
+    known = (catalogue or current_catalogue()).ingredient_ids
+    unknown = sorted(ingredient for ingredient in ration if ingredient not in known)
+    if unknown:
+        raise ValueError(f"unknown ingredient(s) in ration: {', '.join(unknown)}")
+    if any(isinstance(share, bool) for share in ration.values()):
+        raise ValueError("ration shares must be numbers")
+    try:
+        ration = {ingredient: float(share) for ingredient, share in ration.items()}
+    except (TypeError, ValueError):
+        raise ValueError("ration shares must be numbers") from None
+    if not all(math.isfinite(share) for share in ration.values()):
+        raise ValueError("ration shares must be finite numbers")
+    if min(ration.values()) < 0 or sum(ration.values()) <= 0:
+        raise ValueError("ration shares must be 0 or more and add up to more than 0")
+    return ration
+
+
+def parse_start(value):
+    if value in ("", None):
+        return None
+    if hasattr(value, "date"):
+        return value.date().isoformat()
+    return date.fromisoformat(str(value).strip()).isoformat()
+
+
+def group_from_record(record, number, default_days=30):
+    # One file row as a group dict; raises ValueError with a readable reason.
+    animal = str(record.get("animal") or "").strip()
+    stage = str(record.get("stage") or "").strip()
+    catalogue = current_catalogue()
+    if (animal, stage) not in catalogue.stage_ids:
+        if animal not in catalogue.livestock:
+            raise ValueError(f"unknown animal {animal!r}")
+        raise ValueError(f"unknown stage {stage!r} for {animal}")
+    try:
+        ration = parse_ration(record.get("ration"), catalogue)
+    except json.JSONDecodeError as error:
+        raise ValueError(f"ration is not valid JSON: {error.msg}") from None
+    try:
+        start = parse_start(record.get("start"))
+    except ValueError:
+        raise ValueError(f"start must be a date like 2024-03-01, got {record.get('start')!r}") from None
+    return {
+        "name": str(record.get("name") or "").strip() or f"Group {number}",
+        "animal": animal,
+        "stage": stage,
+        "count": whole_number(record.get("count"), "count"),
+        "days": whole_number(record.get("days") or default_days, "days"),
+        "ration": ration,
+        "start": start,
+    }
+
+
+def import_groups(source, add, chunk_size=IMPORT_CHUNK_SIZE, default_days=30, file_name=None):
+    # Reads ``source`` a chunk at a time and passes each chunk's valid groups
+    # to ``add`` (for example storage.add_groups for one farm), so memory use
+    # stays at one chunk however long the file is. Row numbers in the error
+    # report match the spreadsheet, with the header on row 1.
+    imported = 0
+    error_count = 0
+    errors = []
+    row = 1
+    for records in read_group_chunks(source, chunk_size, file_name):
+        groups = []
+        for record in records:
+            row += 1
+            # Blank lines, and rows whose cells are all empty, are not groups.
+            if not any(str(value).strip() for value in record.values()):
+                continue
+            try:
+                groups.append(group_from_record(record, row - 1, default_days))
+            except ValueError as error:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"Row": row, "Name": str(record.get("name") or ""), "Error": str(error)})
+        if groups:
+            add(groups)
+            imported += len(groups)
+    return {
+        "imported": imported,
+        "error_count": error_count,
+        "errors": pd.DataFrame(errors, columns=["Row", "Name", "Error"]),
+    }
@@ -0,0 +1,104 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from . import storage
+
+# A delivery adds to the stock, a loss (spoilage, theft) takes from it and a
+# count sets it to what was found in the store.
+STOCK_EVENT_KINDS = ("delivery", "loss", "count")
+DEFAULT_LEAD_DAYS = 7
+DEFAULT_SAFETY_DAYS = 3
+
+
+def stock_on(level, daily_kg, day):
+    # Stock left on ``day`` from a level recorded earlier, fed at ``daily_kg``.
+    if level is None:
+        return 0.0
+    days = max(0, (date.fromisoformat(day) - date.fromisoformat(level["day"])).days)
+    return max(0.0, level["kg"] - daily_kg * days)
+
+
+def apply_stock_event(level, event, daily_kg):
+    if event["kind"] not in STOCK_EVENT_KINDS:
+        raise ValueError(f"unknown stock event {event['kind']!r}")
+    if event["kind"] == "count":
+        kg = event["kg"]
+    elif event["kind"] == "delivery":
+        kg = stock_on(level, daily_kg, event["day"]) + event["kg"]
+    else:
+        kg = max(0.0, stock_on(level, daily_kg, event["day"]) - event["kg"])
+    return {"day": event["day"], "kg": float(kg)}
+
+
+def record_stock_event(connection, farm, event, daily_kg):
+    # Updates the ingredient's stored level from the event alone, so current
+    # stock never needs the full history. A backdated event is replayed from
+    # the last stock count before it, which is usually only a few events.
+    # ``daily_kg`` is the ingredient's use per day in the current plan.
+    event = dict(event, day=date.fromisoformat(str(event["day"])).isoformat(), kg=float(event["kg"]))
+    if event["kg"] < 0:
+        raise ValueError("kg must be 0 or more")
+    ingredient = event["ingredient"]
+    level = storage.load_stock_levels(connection, farm).get(ingredient)
+    if level is None or event["day"] >= level["day"]:
+        level = apply_stock_event(level, event, daily_kg)
+    else:
+        since = storage.last_stock_count(connection, farm, ingredient, event["day"])
+        events = storage.load_stock_events(connection, farm, ingredient, since=since)
+        level = None
+        for past in sorted(events + [event], key=lambda past: past["day"]):
+            level = apply_stock_event(level, past, daily_kg)
+    storage.save_stock_event(connection, farm, event, level)
+    return level
+
+
+def stock_status(levels, daily_use, today=None, lead_days=None, safety_days=DEFAULT_SAFETY_DAYS):
+    # Stock on hand today, days of cover and the last day to reorder for
+    # every ingredient that is in stock or in the plan. ``daily_use`` maps
+    # ingredient to kg per day; ``lead_days`` maps ingredient to the days a
+    # delivery takes (DEFAULT_LEAD_DAYS when missing). The reorder point is
+    # the stock that lasts the lead time plus ``safety_days``.
+    today = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+    lead_days = lead_days or {}
+    ingredients = list(dict.fromkeys([*daily_use, *levels]))
+    daily = np.array([float(daily_use.get(ingredient, 0.0)) for ingredient in ingredients])
+    on_hand = np.array([
+        stock_on(levels.get(ingredient), rate, today.date().isoformat()) for ingredient, rate in zip(ingredients, daily)
+    ])
+    lead = np.array([int(lead_days.get(ingredient, DEFAULT_LEAD_DAYS)) for ingredient in ingredients])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cover = np.where(daily > 0, on_hand / daily, np.inf)
+    finite = np.isfinite(cover)
+    cover_days = np.where(finite, np.floor(cover), 0).astype(int)
+    runs_out = today + pd.to_timedelta(cover_days, unit="D")
+    reorder_by = runs_out - pd.to_timedelta(lead + safety_days, unit="D")
+    status = np.select(
+        [~finite, on_hand <= 0, reorder_by <= today],
+        ["Not used", "Out of stock", "Order now"],
+        np.where(reorder_by <= today + pd.Timedelta(days=7), "Order this week", "OK"),
+    )
+    return pd.DataFrame({
+        "Ingredient": ingredients,
+        "On hand kg": on_hand,
+        "Daily kg": daily,
+        "Days of cover": np.where(finite, cover, np.nan),
+        "Runs out": runs_out.where(finite),
+        "Lead days": lead,
+        "Reorder point kg": daily * (lead + safety_days),
+        "Reorder by": reorder_by.where(finite),
+        "Status": status,
+    })
+
+
+def stock_projection(levels, daily_use, today=None, days=60):
+    # Kg left each day from today, per ingredient, if nothing more arrives.
+    today = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+    status = stock_status(levels, daily_use, today)
+    elapsed = np.arange(days)[:, None]
+    left = np.clip(status["On hand kg"].to_numpy() - status["Daily kg"].to_numpy() * elapsed, 0, None)
+    return pd.DataFrame(
+        left, index=pd.date_range(today, periods=days, freq="D", name="Date"), columns=status["Ingredient"].tolist(),
+    )
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+from .catalogue import current_catalogue
+
+# Intake grows through each stage from (1 - GROWTH_SPREAD) to
+# (1 + GROWTH_SPREAD) times the stage's daily_kg, so the stage average is kept.
+GROWTH_SPREAD = 0.25
+
+
+# Sale days the app and the API accept.
+MIN_DAYS_TO_SALE = 30
+MAX_DAYS_TO_SALE = 1095
+
+# Days-to-sale and forage axes for lifetime_cost_grid.
+GRID_DAYS = np.arange(MIN_DAYS_TO_SALE, MAX_DAYS_TO_SALE + 1, 15)
+GRID_FORAGE = np.arange(0, 81, 5)
+
+
+def intake_scale(animal, catalogue):
+    # The stage rations' daily_kg describe typical animals on that stage, but
+    # a lifecycle may spend longer on a stage than the stage's name says
+    # (goat kids on the kid grower ration all the way to sale, for example).
+    # Intake is scaled so that at the typical days_to_sale it averages the
+    # lifecycle's avg_daily_kg; other sale days keep the stage shape.
+    lifecycle = catalogue.lifecycle[animal]
+    remaining = lifecycle["days_to_sale"]
+    stage_kg = 0.0
+    for stage, length in lifecycle["stages"]:
+        days = remaining if length is None else min(length, remaining)
+        stage_kg += catalogue.profile(animal, stage).daily_kg * days
+        remaining -= days
+        if remaining <= 0:
+            break
+    return lifecycle["avg_daily_kg"] * lifecycle["days_to_sale"] / stage_kg
+
+
+def lifecycle_curves(animal, days_to_sale, catalogue=None):
+    # lifecycle_curve for several sale days at once: rows follow
+    # ``days_to_sale``, columns run to the longest one and are zero (stage 0)
+    # after each row's sale day.
+    catalogue = catalogue or current_catalogue()
+    lifecycle = catalogue.lifecycle[animal]
+    sale = np.asarray(days_to_sale, dtype=int)[:, None]
+    days = np.arange(int(sale.max()) if sale.size else 0)[None, :]
+    intake = np.zeros((sale.shape[0], days.shape[1]))
+    stage_index = np.zeros(intake.shape, dtype=int)
+    scale = intake_scale(animal, catalogue)
+
+    start = 0
+    for index, (stage, length) in enumerate(lifecycle["stages"]):
+        end = sale if length is None else np.minimum(sale, start + length)
+        in_stage = (days >= start) & (days < end)
+        position = (days - start + 0.5) / np.maximum(end - start, 1)
+        daily_kg = scale * catalogue.profile(animal, stage).daily_kg * (1 + GROWTH_SPREAD * (2 * position - 1))
+        intake = np.where(in_stage, daily_kg, intake)
+        stage_index = np.where(in_stage, index, stage_index)
+        if length is None:
+            break
+        start += length
+
+    survival = np.where(
+        days < sale, (1 - lifecycle["mortality_pct"] / 100) ** (days / np.maximum(sale, 1)), 0.0
+    )
+    return intake, stage_index, survival
+
+
+def lifecycle_curve(animal, days_to_sale, catalogue=None):
+    # Per-head daily intake, stage index and share of animals still alive for
+    # each day from start to sale.
+    intake, stage_index, survival = lifecycle_curves(animal, [days_to_sale], catalogue)
+    return intake[0], stage_index[0], survival[0]
+
+
+def simulate_lifecycle(groups):
+    # ``groups`` are dicts with name, animal and count, plus optional
+    # days_to_sale and forage_pct (lifecycle defaults otherwise). Groups that
+    # share an animal and days_to_sale share one curve, so the work is array
+    # operations over groups x days.
+    catalogue = current_catalogue()
+    lifecycles = catalogue.lifecycle
+    names = [group["name"] for group in groups]
+    animals = [group["animal"] for group in groups]
+    counts = np.array([group["count"] for group in groups], dtype=float)
+    days_to_sale = np.array([
+        int(group.get("days_to_sale") or lifecycles[group["animal"]]["days_to_sale"]) for group in groups
+    ])
+    forage_factor = 1 - np.array([
+        group.get("forage_pct", lifecycles[group["animal"]]["forage_offset_default"]) for group in groups
+    ], dtype=float) / 100
+    horizon = int(days_to_sale.max()) if len(groups) else 0
+
+    alive = np.zeros((len(groups), horizon))
+    demand = np.zeros((len(groups), horizon))
+    ingredient_kg = np.zeros((horizon, len(catalogue.ingredients)))
+
+    curves = {}
+    for row, key in enumerate(zip(animals, days_to_sale.tolist())):
+        curves.setdefault(key, []).append(row)
+
+    for (animal, days), rows in curves.items():
+        intake, stage_index, survival = lifecycle_curve(animal, days, catalogue)
+        rows = np.array(rows)
+        heads = counts[rows, None] * survival
+        alive[rows, :days] = heads
+        demand[rows, :days] = heads * intake * forage_factor[rows, None]
+        stage_shares = np.array([
+            catalogue.profile(animal, stage).share_vector for stage, _ in lifecycles[animal]["stages"]
+        ])
+        ingredient_kg[:days] += demand[rows, :days].sum(axis=0)[:, None] * stage_shares[stage_index]
+
+    daily = pd.DataFrame({
+        "Day": np.arange(1, horizon + 1),
+        "Animals": alive.sum(axis=0),
+        "Feed kg": demand.sum(axis=0),
+    })
+    used = ingredient_kg.any(axis=0)
+    ingredients = pd.DataFrame(ingredient_kg[:, used], columns=np.array(catalogue.ingredients)[used])
+    ingredients.insert(0, "Day", daily["Day"])
+
+    mortality = np.array([lifecycles[animal]["mortality_pct"] for animal in animals], dtype=float) / 100
+    group_totals = pd.DataFrame({
+        "Group": names,
+        "Animal": animals,
+        "Count": counts.astype(int),
+        "Days to sale": days_to_sale,
+        "Expected at sale": counts * (1 - mortality),
+        "Feed kg": demand.sum(axis=1),
+    })
+    return {"daily": daily, "ingredients": ingredients, "groups": group_totals}
+
+
+def lifetime_cost_grid(animal, count, prices, bag_size, stock_prices=(0.0,), forage_pct=GRID_FORAGE, days_to_sale=GRID_DAYS):
+    # Lifetime cost over every forage x days-to-sale x stock-price
+    # combination. Feed cost only depends on days to sale, so the curves are
+    # built once per sale day and forage and stock price are broadcast on top.
+    forage_pct = np.asarray(forage_pct, dtype=float)
+    days_to_sale = np.asarray(days_to_sale, dtype=int)
+    stock_prices = np.asarray(stock_prices, dtype=float)
+
+    catalogue = current_catalogue()
+    intake, stage_index, survival = lifecycle_curves(animal, days_to_sale, catalogue)
+    price_per_kg = np.array([prices.get(item, 0.0) for item in catalogue.ingredients], dtype=float) / bag_size
+    stage_cost = np.array([
+        catalogue.profile(animal, stage).share_vector @ price_per_kg
+        for stage, _ in catalogue.lifecycle[animal]["stages"]
+    ])
+    eaten = count * survival * intake
+    feed_kg = eaten.sum(axis=1)
+    feed_cost = (eaten * stage_cost[stage_index]).sum(axis=1)
+
+    forage_factor = (1 - forage_pct / 100)[:, None, None]
+    total = forage_factor * feed_cost[None, :, None] + count * stock_prices[None, None, :]
+    return {
+        "forage_pct": forage_pct,
+        "days_to_sale": days_to_sale,
+        "stock_prices": stock_prices,
+        "feed_kg": forage_factor[:, :, 0] * feed_kg[None, :],
+        "total_cost": total,
+        "cost_per_animal": total / count if count else np.zeros_like(total),
+    }
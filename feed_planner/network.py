@@ -0,0 +1,91 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .catalogue import worker_initializer
+from .planning import add_costs, calculate_farm_plan
+
+UNASSIGNED_REGION = "No region"
+# Farms are sent to worker processes in chunks so that 5,000 small farms
+# are not 5,000 round trips.
+NETWORK_CHUNK_SIZE = 250
+
+
+def plan_farm_chunk(farms, prices, bag_size):
+    # All groups of a chunk of farms go through calculate_farm_plan in one
+    # pass. Groups are numbered for the pass, so the feed rows can be mapped
+    # back to their farm and group name afterwards.
+    groups = [group for _, farm_groups in farms for group in farm_groups]
+    farm_names = np.array([farm for farm, farm_groups in farms for _ in farm_groups], dtype=object)
+    group_names = np.array([group["name"] for group in groups], dtype=object)
+    feed, _, _ = calculate_farm_plan([dict(group, name=number) for number, group in enumerate(groups)])
+    number = feed["Group"].to_numpy(dtype=int)
+    feed["Group"] = group_names[number]
+    feed.insert(0, "Farm", farm_names[number])
+    return add_costs(feed, prices, bag_size)
+
+
+def plan_network(farm_groups, prices, bag_size, regions=None, workers=None, chunk_size=NETWORK_CHUNK_SIZE):
+    # ``farm_groups`` maps farm name to its groups and ``regions`` farm name to
+    # region. Each farm is planned on its own, the same way as a single farm
+    # plan, and the results are then rolled up by region.
+    regions = regions or {}
+    farms = [(farm, groups) for farm, groups in farm_groups.items() if groups]
+    chunks = [farms[start:start + chunk_size] for start in range(0, len(farms), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(chunks) <= 1:
+        feeds = [plan_farm_chunk(chunk, prices, bag_size) for chunk in chunks]
+    else:
+        # Workers are spawned rather than forked: the app calls this from a
+        # thread of the Streamlit server, and forking a threaded process can
+        # copy locks that another thread holds. They are handed this
+        # process's catalogue rather than reading the file again.
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"), **worker_initializer(),
+        ) as executor:
+            feeds = list(executor.map(plan_farm_chunk, chunks, [prices] * len(chunks), [bag_size] * len(chunks)))
+
+    feed = pd.concat(feeds, ignore_index=True) if feeds else plan_farm_chunk([], prices, bag_size)
+    feed.insert(0, "Region", feed["Farm"].map(regions).fillna(UNASSIGNED_REGION))
+    return network_rollup(feed, {farm: len(groups) for farm, groups in farms}, bag_size)
+
+
+def network_rollup(feed, group_counts, bag_size):
+    # Each farm takes delivery of whole bags, so bag orders are rounded up per
+    # farm and ingredient before they are added up for the region.
+    farm_ingredients = feed.groupby(["Region", "Farm", "Ingredient"], as_index=False, observed=True)[
+        ["Daily kg", "Plan kg", "Plan cost"]
+    ].sum()
+    farm_ingredients["Bags to order"] = np.ceil(farm_ingredients["Plan kg"] / bag_size - 1e-9).astype(int)
+
+    farms = farm_ingredients.groupby(["Region", "Farm"], as_index=False, observed=True)[
+        ["Daily kg", "Plan kg", "Bags to order", "Plan cost"]
+    ].sum()
+    farms.insert(2, "Groups", farms["Farm"].map(group_counts).fillna(0).astype(int))
+
+    regions = farm_ingredients.groupby(["Region", "Ingredient"], as_index=False, observed=True).agg(**{
+        "Farms": ("Farm", "nunique"),
+        "Daily kg": ("Daily kg", "sum"),
+        "Plan kg": ("Plan kg", "sum"),
+        "Bags to order": ("Bags to order", "sum"),
+        "Plan cost": ("Plan cost", "sum"),
+    })
+    region_totals = farms.groupby("Region", as_index=False, observed=True).agg(**{
+        "Farms": ("Farm", "count"),
+        "Groups": ("Groups", "sum"),
+        "Daily kg": ("Daily kg", "sum"),
+        "Plan kg": ("Plan kg", "sum"),
+        "Bags to order": ("Bags to order", "sum"),
+        "Plan cost": ("Plan cost", "sum"),
+    })
+    return {
+        "feed": feed,
+        "farm_ingredients": farm_ingredients,
+        "farms": farms,
+        "regions": regions,
+        "region_totals": region_totals,
+    }
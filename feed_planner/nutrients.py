@@ -0,0 +1,41 @@
+import numpy as np
+
+from .catalogue import current_catalogue
+from .data import NUTRIENTS
+
+NUTRIENT_LABELS = {
+    "crude_protein": "Crude protein %",
+    "energy": "Energy MJ/kg",
+    "calcium": "Calcium %",
+    "phosphorus": "Phosphorus %",
+    "lysine": "Lysine %",
+    "methionine": "Methionine %",
+}
+
+
+def ration_shares(ration, catalogue=None):
+    # ``ration`` as shares of every catalogue ingredient, in catalogue order.
+    catalogue = catalogue or current_catalogue()
+    shares = np.zeros(len(catalogue.ingredients))
+    for ingredient, percentage in ration.items():
+        shares[catalogue.ingredient_ids[ingredient]] += percentage
+    total = shares.sum()
+    return shares / total if total > 0 else shares
+
+
+def ration_nutrient_vector(ration):
+    catalogue = current_catalogue()
+    return ration_shares(ration, catalogue) @ catalogue.nutrient_matrix
+
+
+def ration_nutrients(ration):
+    return dict(zip(NUTRIENTS, ration_nutrient_vector(ration).tolist()))
+
+
+def stage_nutrient_vector(animal, stage):
+    catalogue = current_catalogue()
+    return catalogue.stage_nutrients[catalogue.stage_ids[(animal, stage)]]
+
+
+def stage_nutrients(animal, stage):
+    return dict(zip(NUTRIENTS, stage_nutrient_vector(animal, stage).tolist()))
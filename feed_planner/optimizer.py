@@ -0,0 +1,107 @@
+import numpy as np
+
+from .catalogue import current_catalogue
+from .nutrients import NUTRIENTS, ration_nutrients, stage_nutrients
+
+# Default nutrient limits for a stage, as (min, max) multiples of what the
+# stage's template ration supplies. None leaves that side open.
+TEMPLATE_LIMITS = {
+    "crude_protein": (0.98, None),
+    "energy": (0.98, 1.05),
+    "calcium": (0.9, 1.2),
+    "phosphorus": (0.9, None),
+    "lysine": (0.95, None),
+    "methionine": (0.95, None),
+}
+
+# Usual upper inclusion limits, % of the mix. Premixes and salt supply
+# nutrients that are not modelled here, so they keep their template share.
+MAX_INCLUSION = {
+    "fishmeal": 15,
+    "sunflower meal": 20,
+    "rice bran": 25,
+    "wheat bran": 30,
+    "maize bran": 50,
+    "molasses": 10,
+    "limestone": 14,
+    "dl methionine": 1,
+    "vegetable oil": 6,
+}
+FIXED_INGREDIENTS = {"premix", "mineral premix", "salt"}
+
+
+def nutrient_limits(animal, stage, template_limits=None):
+    profile = stage_nutrients(animal, stage)
+    limits = {}
+    for nutrient, (low, high) in (template_limits or TEMPLATE_LIMITS).items():
+        limits[nutrient] = (
+            None if low is None else profile[nutrient] * low,
+            None if high is None else profile[nutrient] * high,
+        )
+    return limits
+
+
+def least_cost_ration(animal, stage, prices, bag_size, limits=None, ingredients=None):
+    # Cheapest mix of the stage's ingredients (or ``ingredients``) that meets
+    # ``limits``. Ingredients without a price, and FIXED_INGREDIENTS, stay at
+    # their template share so only what the farmer actually buys is
+    # rebalanced. Returns None when no mix meets the limits.
+    from scipy.optimize import linprog
+
+    catalogue = current_catalogue()
+    template = dict(catalogue.profile(animal, stage).shares)
+    ingredients = list(ingredients or template)
+    limits = nutrient_limits(animal, stage) if limits is None else limits
+
+    cost_per_kg = np.array([prices.get(ingredient, 0.0) / bag_size for ingredient in ingredients])
+    template_shares = np.array([template.get(ingredient, 0.0) for ingredient in ingredients])
+    if not (cost_per_kg > 0).any():
+        return None
+    content = catalogue.nutrient_matrix[[catalogue.ingredient_ids[ingredient] for ingredient in ingredients]].T
+
+    rows, row_limits = [], []
+    for index, nutrient in enumerate(NUTRIENTS):
+        low, high = limits.get(nutrient, (None, None))
+        if low is not None:
+            rows.append(-content[index])
+            row_limits.append(-low)
+        if high is not None:
+            rows.append(content[index])
+            row_limits.append(high)
+
+    result = linprog(
+        cost_per_kg,
+        A_ub=np.array(rows) if rows else None,
+        b_ub=np.array(row_limits) if rows else None,
+        A_eq=np.ones((1, len(ingredients))),
+        b_eq=[1.0],
+        bounds=[
+            (0.0, max(share, MAX_INCLUSION.get(ingredient, 100) / 100))
+            if price > 0 and ingredient not in FIXED_INGREDIENTS else (share, share)
+            for ingredient, price, share in zip(ingredients, cost_per_kg, template_shares)
+        ],
+        method="highs",
+    )
+    if not result.success:
+        return None
+
+    ration = {
+        ingredient: round(float(share) * 100, 2)
+        for ingredient, share in zip(ingredients, result.x)
+        if share > 1e-6
+    }
+    return {
+        "ration": ration,
+        "cost_per_kg": float(result.fun),
+        "template_cost_per_kg": float(cost_per_kg @ template_shares),
+        "nutrients": ration_nutrients(ration),
+    }
+
+
+def least_cost_rations(prices, bag_size, template_limits=None):
+    results = {}
+    for animal, animal_data in current_catalogue().livestock.items():
+        for stage in animal_data["stages"]:
+            limits = nutrient_limits(animal, stage, template_limits)
+            results[(animal, stage)] = least_cost_ration(animal, stage, prices, bag_size, limits)
+    return results
@@ -0,0 +1,333 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .catalogue import current_catalogue, stage_ids
+from .nutrients import ration_shares
+
+
+def vocabulary(values):
+    # A categorical dtype with sorted categories, so groupby and sorting order
+    # rows just as they did with plain strings, plus each value's code.
+    dtype = pd.CategoricalDtype(sorted(values))
+    return dtype, {value: code for code, value in enumerate(dtype.categories)}
+
+
+@lru_cache(maxsize=2)
+def vocabularies(catalogue):
+    # Built once per catalogue; a reloaded catalogue gets its own.
+    return {
+        "animal": vocabulary(catalogue.livestock),
+        "stage": vocabulary({stage for animal_data in catalogue.livestock.values() for stage in animal_data["stages"]}),
+        "ingredient": vocabulary(catalogue.ingredients),
+        "feeding_time": vocabulary({time for times in catalogue.feeding_windows.values() for time in times}),
+    }
+
+
+def categorical(values, vocabulary=None):
+    # Values from a fixed (dtype, codes) vocabulary are looked up in codes,
+    # which is much cheaper than letting pandas infer categories for every
+    # small frame. Values outside it (say a custom ingredient) get
+    # categories of their own instead of turning into missing values.
+    if vocabulary is not None:
+        dtype, codes = vocabulary
+        try:
+            return pd.Categorical.from_codes([codes[value] for value in values], dtype=dtype, validate=False)
+        except KeyError:
+            pass
+    return pd.Categorical(values)
+
+
+def repeated(value, rows):
+    # One value on every row, for the single-group frames.
+    return pd.Categorical.from_codes(np.zeros(rows, dtype=np.int8), categories=[value], validate=False)
+
+
+def take(categories, rows):
+    return pd.Categorical.from_codes(categories.codes[rows], dtype=categories.dtype)
+
+
+def profile_for(animal, stage):
+    return current_catalogue().profile(animal, stage)
+
+
+def normalize_ration(ration):
+    total = sum(ration.values())
+    if total <= 0:
+        return {}
+    return {ingredient: percentage / total for ingredient, percentage in ration.items()}
+
+
+# The per-row arithmetic, shared by the DataFrame functions below and the
+# plain-dict rows the planning API answers small requests with. Each works
+# on floats and on arrays alike.
+def feed_amounts(daily_total_kg, shares, days):
+    daily_kg = daily_total_kg * shares
+    return {"Daily kg": daily_kg, "Plan kg": daily_kg * days, "Ration %": shares * 100}
+
+
+def feeding_amounts(daily_total_kg, feedings, days):
+    return {"Kg per feeding": daily_total_kg / np.maximum(feedings, 1), "Feedings per day": feedings, "Plan days": days}
+
+
+def ingredient_costs(plan_kg, price, bag_size):
+    cost_per_kg = price / bag_size
+    return {
+        "Price per bag": price,
+        "Cost per kg": cost_per_kg,
+        "Plan cost": plan_kg * cost_per_kg,
+        "Bags needed": plan_kg / bag_size,
+    }
+
+
+SUMMARY_COLUMNS = ("Daily kg", "Plan kg", "Bags needed", "Plan cost")
+
+
+def calculate_group_plan(name, animal, stage, count, days, ration_override=None):
+    catalogue = current_catalogue()
+    vocabulary = vocabularies(catalogue)
+    profile = catalogue.profile(animal, stage)
+    daily_total_kg = profile.daily_kg * count
+    normalized = normalize_ration(ration_override) if ration_override else profile.shares
+    shares = np.fromiter(normalized.values(), dtype=float, count=len(normalized))
+    rows = len(shares)
+
+    return pd.DataFrame(
+        {
+            "Group": repeated(name, rows),
+            "Animal": categorical([animal] * rows, vocabulary["animal"]),
+            "Stage": categorical([stage] * rows, vocabulary["stage"]),
+            "Ingredient": categorical(normalized, vocabulary["ingredient"]),
+            **feed_amounts(daily_total_kg, shares, days),
+        }
+    )
+
+
+def calculate_farm_plan(groups):
+    names = categorical([group["name"] for group in groups])
+    animal_names = [group["animal"] for group in groups]
+    stage_names = [group["stage"] for group in groups]
+    catalogue = current_catalogue()
+    vocabulary = vocabularies(catalogue)
+    animals = categorical(animal_names, vocabulary["animal"])
+    stages = categorical(stage_names, vocabulary["stage"])
+    ids = stage_ids(groups, catalogue)
+    custom = {i: normalize_ration(group["ration"]) for i, group in enumerate(groups) if group.get("ration")}
+
+    counts = np.array([group["count"] for group in groups], dtype=float)
+    days = np.array([group["days"] for group in groups], dtype=float)
+    daily_total_kg = catalogue.daily_kg[ids] * counts
+
+    # Ingredient columns in the order they first appear. Stock rations come
+    # already normalised from the catalogue and are filled in one row per
+    # stage, then copied to every group on that stage.
+    stage_position = {}
+    rations = []
+    for i, stage in enumerate(ids.tolist()):
+        if i in custom:
+            rations.append(custom[i])
+        elif stage not in stage_position:
+            stage_position[stage] = len(stage_position)
+            rations.append(catalogue.stages[stage].shares)
+    ingredients = list(dict.fromkeys(ingredient for ration in rations for ingredient in ration))
+    column = {ingredient: j for j, ingredient in enumerate(ingredients)}
+
+    stage_shares = np.full((len(stage_position), len(ingredients)), np.nan)
+    for stage, position in stage_position.items():
+        ration = catalogue.stages[stage].shares
+        stage_shares[position, [column[ingredient] for ingredient in ration]] = list(ration.values())
+    positions = np.full(len(catalogue.stages), -1)
+    positions[list(stage_position)] = list(stage_position.values())
+    stock = np.ones(len(groups), dtype=bool)
+    stock[list(custom)] = False
+    shares = np.full((len(groups), len(ingredients)), np.nan)
+    shares[stock] = stage_shares[positions[ids[stock]]]
+    for i, ration in custom.items():
+        shares[i, [column[ingredient] for ingredient in ration]] = list(ration.values())
+
+    rows, cols = np.nonzero(~np.isnan(shares))
+
+    feed_df = pd.DataFrame(
+        {
+            "Group": take(names, rows),
+            "Animal": take(animals, rows),
+            "Stage": take(stages, rows),
+            "Ingredient": take(categorical(ingredients, vocabulary["ingredient"]), cols),
+            **feed_amounts(daily_total_kg[rows], shares[rows, cols], days[rows]),
+        }
+    )
+
+    times = [catalogue.stages[stage].feeding_times for stage in ids]
+    feedings = catalogue.feedings[ids]
+    repeat = np.repeat(np.arange(len(groups)), feedings)
+    schedule_df = pd.DataFrame(
+        {
+            "Group": take(names, repeat),
+            "Animal": take(animals, repeat),
+            "Stage": take(stages, repeat),
+            "Feeding time": categorical(
+                [time for group_times in times for time in group_times], vocabulary["feeding_time"]
+            ),
+            **feeding_amounts(
+                daily_total_kg[repeat], feedings[repeat],
+                np.array([group["days"] for group in groups], dtype=np.int32)[repeat],
+            ),
+        }
+    )
+
+    groups_df = pd.DataFrame(
+        {
+            "Group": names,
+            "Animal": animals,
+            "Stage": stages,
+            "Count": np.array([group["count"] for group in groups], dtype=np.int64),
+            "Days": np.array([group["days"] for group in groups], dtype=np.int32),
+            "Daily kg": daily_total_kg,
+        }
+    )
+
+    return feed_df, schedule_df, groups_df
+
+
+def ingredient_rates(groups, catalogue=None):
+    # Daily kg of each catalogue ingredient for every group (groups x ingredients).
+    catalogue = catalogue or current_catalogue()
+    ids = stage_ids(groups, catalogue)
+    daily_total_kg = catalogue.daily_kg[ids] * np.array([group["count"] for group in groups], dtype=float)
+    rates = daily_total_kg[:, None] * catalogue.shares[ids]
+    for row, group in enumerate(groups):
+        if group.get("ration"):
+            rates[row] = daily_total_kg[row] * ration_shares(group["ration"], catalogue)
+    return rates
+
+
+def build_schedule(name, animal, stage, count, days):
+    catalogue = current_catalogue()
+    vocabulary = vocabularies(catalogue)
+    profile = catalogue.profile(animal, stage)
+    daily_total_kg = profile.daily_kg * count
+    times = profile.feeding_times
+    rows = len(times)
+
+    return pd.DataFrame(
+        {
+            "Group": repeated(name, rows),
+            "Animal": categorical([animal] * rows, vocabulary["animal"]),
+            "Stage": categorical([stage] * rows, vocabulary["stage"]),
+            "Feeding time": categorical(times, vocabulary["feeding_time"]),
+            **feeding_amounts(
+                np.full(rows, daily_total_kg), np.full(rows, profile.feedings, dtype=np.int8),
+                np.full(rows, days, dtype=np.int32),
+            ),
+        }
+    )
+
+
+def add_costs(feed_df, prices, bag_size):
+    priced = feed_df.copy()
+    price = priced["Ingredient"].map(prices).astype(float).fillna(0.0)
+    for column, values in ingredient_costs(priced["Plan kg"], price, bag_size).items():
+        priced[column] = values
+    return priced
+
+
+def summarize_ingredients(feed_df):
+    return feed_df.groupby("Ingredient", as_index=False, observed=True).agg(dict.fromkeys(SUMMARY_COLUMNS, "sum"))
+
+
+def merge_ingredient_summaries(summary, other):
+    return summarize_ingredients(pd.concat([summary, other], ignore_index=True))
+
+
+def concat_plan_frames(frames):
+    # pd.concat for plan frames built from different batches of groups.
+    # Group names are categorical per batch, and concat would turn columns
+    # whose categories differ into plain objects; they are unioned first so
+    # the result has the dtypes one pass over all the groups would give.
+    if len(frames) == 1:
+        return frames[0]
+    first = frames[0]
+    for column in first.columns:
+        dtype = first[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype) and any(frame[column].dtype != dtype for frame in frames):
+            union = pd.CategoricalDtype(sorted(set().union(*(frame[column].cat.categories for frame in frames))))
+            frames = [frame.astype({column: union}) for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def group_plan_rows(group, prices, bag_size, catalogue=None):
+    # The rows calculate_group_plan and add_costs give for one group, as
+    # dicts, for callers that answer small requests without pandas.
+    profile = (catalogue or current_catalogue()).profile(group["animal"], group["stage"])
+    daily_total_kg = profile.daily_kg * group["count"]
+    shares = normalize_ration(group["ration"]) if group.get("ration") else profile.shares
+    rows = []
+    for ingredient, share in shares.items():
+        amounts = feed_amounts(daily_total_kg, share, group["days"])
+        rows.append({
+            "Group": group["name"],
+            "Animal": group["animal"],
+            "Stage": group["stage"],
+            "Ingredient": ingredient,
+            **amounts,
+            **ingredient_costs(amounts["Plan kg"], float(prices.get(ingredient, 0.0)), bag_size),
+        })
+    return rows
+
+
+def group_schedule_rows(group, catalogue=None):
+    # The rows build_schedule gives for one group.
+    profile = (catalogue or current_catalogue()).profile(group["animal"], group["stage"])
+    amounts = feeding_amounts(profile.daily_kg * group["count"], profile.feedings, group["days"])
+    return [
+        {"Group": group["name"], "Animal": group["animal"], "Stage": group["stage"], "Feeding time": time, **amounts}
+        for time in profile.feeding_times
+    ]
+
+
+def farm_plan_rows(groups, prices, bag_size):
+    # build_farm_plan's feed and summary as lists of dicts, rows in the same
+    # order: each group's ingredients in the order they first appear.
+    catalogue = current_catalogue()
+    order = {}
+    for group in groups:
+        order.update(dict.fromkeys(group.get("ration") or catalogue.profile(group["animal"], group["stage"]).ration))
+    position = {ingredient: index for index, ingredient in enumerate(order)}
+    feed = [
+        row
+        for group in groups
+        for row in sorted(
+            group_plan_rows(group, prices, bag_size, catalogue), key=lambda row: position[row["Ingredient"]],
+        )
+    ]
+    totals = {}
+    for row in feed:
+        total = totals.setdefault(row["Ingredient"], dict.fromkeys(SUMMARY_COLUMNS, 0.0))
+        for column in SUMMARY_COLUMNS:
+            total[column] += row[column]
+    return feed, [{"Ingredient": ingredient, **totals[ingredient]} for ingredient in sorted(totals)]
+
+
+def build_farm_plan(groups, prices, bag_size):
+    feed, schedule, groups_df = calculate_farm_plan(groups)
+    feed = add_costs(feed, prices, bag_size)
+    return {
+        "feed": feed,
+        "schedule": schedule,
+        "groups": groups_df,
+        "summary": summarize_ingredients(feed),
+    }
+
+
+def plan_sheets(plan):
+    sheets = {
+        "Groups": plan["groups"],
+        "Shopping List": plan["summary"],
+        "Feed Details": plan["feed"],
+        "Schedule": plan["schedule"],
+    }
+    if "calendar" in plan:
+        sheets["Weekly Demand"] = plan["calendar"]["weekly"].reset_index()
+        sheets["Weekly Bags"] = plan["calendar"]["bags"].reset_index()
+    return sheets
@@ -0,0 +1,154 @@
+import math
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+# An offer is {"supplier", "ingredient", "bag_kg", "min_bags", "price"}: the
+# price per bag once at least ``min_bags`` bags of that size are bought from
+# that supplier. Several offers with the same supplier, ingredient and bag
+# size are price breaks on the whole order; the smallest ``min_bags`` is the
+# supplier's minimum order.
+OFFER_LABELS = {
+    "supplier": "Supplier",
+    "ingredient": "Ingredient",
+    "bag_kg": "Bag kg",
+    "min_bags": "Min bags",
+    "price": "Price per bag",
+}
+DEFAULT_SUPPLIER = "Usual supplier"
+# Bag sizes and needs are matched in steps of 100 g.
+GRAMS_PER_STEP = 100
+
+
+def offers_from_prices(prices, bag_size, supplier=DEFAULT_SUPPLIER):
+    # The sidebar price list as offers: one bag size and no minimum order.
+    return [
+        {"supplier": supplier, "ingredient": ingredient, "bag_kg": float(bag_size), "min_bags": 1, "price": float(price)}
+        for ingredient, price in prices.items()
+        if price > 0
+    ]
+
+
+def offer_breaks(offers):
+    # {ingredient: [(supplier, bag_kg, [(min_bags, price), ...]), ...]}.
+    # Offers without a bag size or price are skipped like unpriced
+    # ingredients, and a break is only kept if it is cheaper than every
+    # smaller order from the same supplier.
+    rows = {}
+    for offer in offers:
+        bag_kg, price = float(offer.get("bag_kg") or 0), float(offer.get("price") or 0)
+        if not bag_kg > 0 or not price > 0:
+            continue
+        key = (offer["ingredient"], str(offer.get("supplier") or DEFAULT_SUPPLIER), bag_kg)
+        rows.setdefault(key, []).append((max(1, int(offer.get("min_bags") or 1)), price))
+    breaks = {}
+    for (ingredient, supplier, bag_kg), offer_rows in sorted(rows.items()):
+        kept = []
+        for min_bags, price in sorted(offer_rows):
+            if not kept or price < kept[-1][1]:
+                kept.append((min_bags, price))
+        breaks.setdefault(ingredient, []).append((supplier, bag_kg, kept))
+    return breaks
+
+
+def add_bags(start, bag_steps, price):
+    # Cheapest cost of covering each amount with ``start`` plus any number of
+    # extra bags of ``bag_steps`` at ``price``. Along each residue class mod
+    # ``bag_steps`` that is a running minimum of start - k * price, so the
+    # whole array takes one accumulate. Amounts at or below 0 cost start[0].
+    rows = -(-(len(start) + bag_steps) // bag_steps)
+    padded = np.full(rows * bag_steps, np.inf)
+    padded[:bag_steps] = start[0]
+    padded[bag_steps:bag_steps + len(start)] = start
+    steps = np.arange(rows)[:, None] * price
+    covered = np.minimum.accumulate(padded.reshape(rows, bag_steps) - steps, axis=0) + steps
+    return covered.reshape(-1)[bag_steps:bag_steps + len(start)]
+
+
+def extra_bags(start, bag_steps, price, amount):
+    # How many bags add_bags added on top of ``start`` at ``amount``; ties go
+    # to fewer bags.
+    index = amount + bag_steps
+    last, residue = divmod(index, bag_steps)
+    padded = np.concatenate([np.full(bag_steps, start[0]), start])
+    column = padded[residue:index + 1:bag_steps] - np.arange(last + 1) * price
+    return int(np.argmin(column[::-1]))
+
+
+def first_order(cost, min_bags, bag_steps, price):
+    # ``cost`` plus a first order of ``min_bags`` bags at ``price`` each.
+    steps = min(min_bags * bag_steps, len(cost))
+    start = np.full_like(cost, cost[0])
+    start[steps:] = cost[:len(cost) - steps]
+    return start + min_bags * price
+
+
+def offer_options(cost, bag_steps, breaks):
+    # Cost of covering each amount without this offer, then buying it at each
+    # of its price breaks. Under all-units breaks only one break applies.
+    starts = [first_order(cost, min_bags, bag_steps, price) for min_bags, price in breaks]
+    return [cost] + [add_bags(start, bag_steps, price) for start, (_, price) in zip(starts, breaks)], starts
+
+
+def cheapest_purchase(kg, offers):
+    # Whole bags from ``offers`` (supplier, bag_kg, breaks) covering at least
+    # ``kg`` at the lowest cost, as (supplier, bag_kg, bags, price) rows. A
+    # covering knapsack over 100 g steps: cost[x] is the cheapest way to buy
+    # at least x steps with the offers seen so far.
+    sizes = [max(1, round(bag_kg * 1000 / GRAMS_PER_STEP)) for _, bag_kg, _ in offers]
+    unit = reduce(math.gcd, sizes)
+    need = max(0, math.ceil(kg * 1000 / GRAMS_PER_STEP / unit - 1e-9))
+    cost = np.full(need + 1, np.inf)
+    cost[0] = 0.0
+    stages = []
+    for size, (_, _, breaks) in zip(sizes, offers):
+        options, starts = offer_options(cost, size // unit, breaks)
+        stages.append((options, starts))
+        cost = np.minimum.reduce(options)
+
+    # Walk back through the offers from the full need, taking whichever
+    # option gave each amount its cost.
+    purchase = []
+    amount = need
+    for (options, starts), size, (supplier, bag_kg, breaks) in reversed(list(zip(stages, sizes, offers))):
+        choice = int(np.argmin([option[amount] for option in options]))
+        if choice == 0:
+            continue
+        min_bags, price = breaks[choice - 1]
+        bags = min_bags + extra_bags(starts[choice - 1], size // unit, price, amount)
+        amount = max(0, amount - bags * (size // unit))
+        purchase.append((supplier, bag_kg, bags, price))
+    return purchase[::-1]
+
+
+def procurement_plan(needs, offers):
+    # ``needs`` maps ingredient to kg (the shopping list's Plan kg). Returns
+    # the orders to place, each ingredient's cost against its need and the
+    # ingredients nobody offers.
+    breaks = offer_breaks(offers)
+    orders = []
+    missing = []
+    for ingredient, kg in needs.items():
+        if kg <= 0:
+            continue
+        if ingredient not in breaks:
+            missing.append(ingredient)
+            continue
+        for supplier, bag_kg, bags, price in cheapest_purchase(kg, breaks[ingredient]):
+            orders.append({
+                "Ingredient": ingredient,
+                "Supplier": supplier,
+                "Bag kg": bag_kg,
+                "Bags": bags,
+                "Price per bag": price,
+                "Kg bought": bags * bag_kg,
+                "Cost": bags * price,
+            })
+    orders = pd.DataFrame(orders, columns=["Ingredient", "Supplier", "Bag kg", "Bags", "Price per bag", "Kg bought", "Cost"])
+
+    ingredients = orders.groupby("Ingredient", as_index=False, sort=False)[["Bags", "Kg bought", "Cost"]].sum()
+    ingredients.insert(1, "Kg needed", ingredients["Ingredient"].map(needs).astype(float))
+    ingredients.insert(4, "Spare kg", ingredients["Kg bought"] - ingredients["Kg needed"])
+    ingredients["Cost per kg"] = ingredients["Cost"] / ingredients["Kg needed"]
+    return {"orders": orders, "ingredients": ingredients, "missing": missing, "total_cost": float(orders["Cost"].sum())}
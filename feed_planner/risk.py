@@ -0,0 +1,112 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .catalogue import current_catalogue
+from .planning import ingredient_rates
+
+PERCENTILES = (10, 50, 90)
+# Forage saving is drawn from a triangle around the animal's
+# forage_offset_default, this many percentage points either side.
+FORAGE_SPREAD_PCT = 15
+MAX_FORAGE_PCT = 80
+
+
+def risk_inputs(groups, prices, bag_size):
+    # Collapse groups to one row per animal so each scenario is a handful of
+    # dot products. Mortality hits a group in proportion to how much of its
+    # grow-out the plan covers, and animals are lost evenly over the plan, so
+    # the feed actually eaten is base_kg - loss_rate * mortality_kg.
+    catalogue = current_catalogue()
+    lifecycles = catalogue.lifecycle
+    animals = sorted({group["animal"] for group in groups})
+    animal_index = {animal: index for index, animal in enumerate(animals)}
+    rows = np.array([animal_index[group["animal"]] for group in groups], dtype=int)
+    days = np.array([group["days"] for group in groups], dtype=float)
+    counts = np.array([group["count"] for group in groups], dtype=float)
+    exposure = np.minimum(days / np.array([
+        lifecycles[group["animal"]]["days_to_sale"] for group in groups
+    ], dtype=float), 1.0)
+    plan_kg = ingredient_rates(groups, catalogue) * days[:, None]
+
+    base_kg = np.zeros((len(animals), len(catalogue.ingredients)))
+    mortality_kg = np.zeros_like(base_kg)
+    np.add.at(base_kg, rows, plan_kg)
+    np.add.at(mortality_kg, rows, plan_kg * exposure[:, None] / 2)
+    return {
+        "animals": animals,
+        "base_kg": base_kg,
+        "mortality_kg": mortality_kg,
+        "heads": np.bincount(rows, counts, minlength=len(animals)),
+        "exposed_heads": np.bincount(rows, counts * exposure, minlength=len(animals)),
+        "price_per_kg": np.array([prices.get(item, 0.0) for item in catalogue.ingredients], dtype=float) / bag_size,
+        "forage_pct": np.array([lifecycles[animal]["forage_offset_default"] for animal in animals], dtype=float),
+        "mortality": np.array([lifecycles[animal]["mortality_pct"] for animal in animals], dtype=float) / 100,
+    }
+
+
+def simulate_chunk(inputs, scenarios, seed, price_volatility, price_correlation, mortality_volatility, forage):
+    rng = np.random.default_rng(seed)
+    animals = len(inputs["animals"])
+
+    # Lognormal price multipliers with mean 1: a market-wide shock shared by
+    # every ingredient plus an ingredient-specific one.
+    shared = rng.standard_normal((scenarios, 1))
+    own = rng.standard_normal((scenarios, inputs["price_per_kg"].size))
+    shock = np.sqrt(price_correlation) * shared + np.sqrt(1 - price_correlation) * own
+    prices = inputs["price_per_kg"] * np.exp(price_volatility * shock - price_volatility ** 2 / 2)
+
+    # Mortality multipliers per animal, also lognormal with mean 1, capped so
+    # no more than every animal can die.
+    loss = inputs["mortality"] * np.exp(
+        mortality_volatility * rng.standard_normal((scenarios, animals)) - mortality_volatility ** 2 / 2
+    )
+    loss = np.minimum(loss, 1.0)
+
+    if forage:
+        mode = inputs["forage_pct"]
+        low = np.maximum(mode - FORAGE_SPREAD_PCT, 0)
+        high = np.minimum(mode + FORAGE_SPREAD_PCT, MAX_FORAGE_PCT)
+        forage_pct = rng.triangular(low, mode, np.maximum(high, mode + 1e-9), (scenarios, animals))
+    else:
+        forage_pct = np.zeros((scenarios, animals))
+
+    fed_cost = prices @ inputs["base_kg"].T - loss * (prices @ inputs["mortality_kg"].T)
+    cost = (fed_cost * (1 - forage_pct / 100)).sum(axis=1)
+    survivors = (inputs["heads"] - loss * inputs["exposed_heads"]).sum(axis=1)
+    return cost, survivors
+
+
+def simulate_plan_risk(
+    groups, prices, bag_size, scenarios=100_000, seed=None, price_volatility=0.25,
+    price_correlation=0.5, mortality_volatility=0.5, forage=True, chunk_size=25_000, workers=1,
+):
+    # Monte Carlo spread of the plan's feed cost. Scenarios run in fixed-size
+    # chunks, each with its own child seed, so results for a given seed are
+    # the same whether the chunks run here or across ``workers`` processes.
+    inputs = risk_inputs(groups, prices, bag_size)
+    sizes = [min(chunk_size, scenarios - start) for start in range(0, scenarios, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    settings = (price_volatility, price_correlation, mortality_volatility, forage)
+
+    if workers == 1 or len(sizes) <= 1:
+        results = [simulate_chunk(inputs, size, child, *settings) for size, child in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(simulate_chunk, inputs, size, child, *settings) for size, child in zip(sizes, seeds)]
+            results = [future.result() for future in futures]
+
+    cost = np.concatenate([result[0] for result in results]) if results else np.zeros(0)
+    survivors = np.concatenate([result[1] for result in results]) if results else np.zeros(0)
+    cost_per_animal = np.divide(cost, survivors, out=np.zeros_like(cost), where=survivors > 0)
+
+    summary = pd.DataFrame(
+        {
+            "Plan cost": np.percentile(cost, PERCENTILES) if len(cost) else np.zeros(len(PERCENTILES)),
+            "Cost per animal": np.percentile(cost_per_animal, PERCENTILES) if len(cost) else np.zeros(len(PERCENTILES)),
+            "Animals left": np.percentile(survivors, PERCENTILES) if len(cost) else np.zeros(len(PERCENTILES)),
+        },
+        index=pd.Index([f"P{percentile}" for percentile in PERCENTILES], name="Percentile"),
+    )
+    return {"cost": cost, "cost_per_animal": cost_per_animal, "survivors": survivors, "summary": summary}
@@ -0,0 +1,324 @@
+import json
+import os
+import sqlite3
+import threading
+
+DEFAULT_DB_PATH = os.environ.get("FEED_PLANNER_DB", "farm_plans.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS farms (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    region TEXT,
+    groups_cleared INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS farm_groups (
+    id INTEGER PRIMARY KEY,
+    farm_id INTEGER NOT NULL REFERENCES farms (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    animal TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    days INTEGER NOT NULL,
+    ration TEXT,
+    start TEXT
+);
+CREATE INDEX IF NOT EXISTS groups_by_farm ON farm_groups (farm_id, id);
+CREATE INDEX IF NOT EXISTS groups_by_farm_name ON farm_groups (farm_id, name);
+CREATE TABLE IF NOT EXISTS prices (
+    farm_id INTEGER NOT NULL REFERENCES farms (id) ON DELETE CASCADE,
+    ingredient TEXT NOT NULL,
+    price REAL NOT NULL,
+    PRIMARY KEY (farm_id, ingredient)
+);
+CREATE TABLE IF NOT EXISTS settings (
+    farm_id INTEGER NOT NULL REFERENCES farms (id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (farm_id, key)
+);
+CREATE TABLE IF NOT EXISTS supplier_offers (
+    id INTEGER PRIMARY KEY,
+    farm_id INTEGER NOT NULL REFERENCES farms (id) ON DELETE CASCADE,
+    supplier TEXT NOT NULL,
+    ingredient TEXT NOT NULL,
+    bag_kg REAL NOT NULL,
+    min_bags INTEGER NOT NULL,
+    price REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS offers_by_farm ON supplier_offers (farm_id, ingredient);
+CREATE TABLE IF NOT EXISTS stock_events (
+    id INTEGER PRIMARY KEY,
+    farm_id INTEGER NOT NULL REFERENCES farms (id) ON DELETE CASCADE,
+    ingredient TEXT NOT NULL,
+    day TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    kg REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stock_events_by_day ON stock_events (farm_id, ingredient, day, id);
+CREATE INDEX IF NOT EXISTS stock_events_by_farm ON stock_events (farm_id, day, id);
+CREATE TABLE IF NOT EXISTS stock_levels (
+    farm_id INTEGER NOT NULL REFERENCES farms (id) ON DELETE CASCADE,
+    ingredient TEXT NOT NULL,
+    day TEXT NOT NULL,
+    kg REAL NOT NULL,
+    PRIMARY KEY (farm_id, ingredient)
+);
+"""
+
+GROUP_COLUMNS = "name, animal, stage, count, days, ration, start"
+
+# Database files whose schema this process has already set up.
+SCHEMA_READY = set()
+SCHEMA_LOCK = threading.Lock()
+
+
+def setup_schema(connection):
+    # WAL lets several app sessions read the same plan while another one
+    # writes; the mode is stored in the database file.
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(SCHEMA)
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(farm_groups)")}
+    if "start" not in columns:
+        with connection:
+            connection.execute("ALTER TABLE farm_groups ADD COLUMN start TEXT")
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(farms)")}
+    if "region" not in columns:
+        with connection:
+            connection.execute("ALTER TABLE farms ADD COLUMN region TEXT")
+    if "groups_cleared" not in columns:
+        with connection:
+            connection.execute("ALTER TABLE farms ADD COLUMN groups_cleared INTEGER NOT NULL DEFAULT 0")
+
+
+def connect(path=DEFAULT_DB_PATH, check_same_thread=True):
+    # The schema is set up by the first connection to each file in this
+    # process. The app keeps one connection per browser session, which
+    # Streamlit reruns on different threads, hence ``check_same_thread``.
+    connection = sqlite3.connect(path, timeout=30, check_same_thread=check_same_thread)
+    connection.execute("PRAGMA foreign_keys=ON")
+    key = path if path == ":memory:" else os.path.abspath(path)
+    with SCHEMA_LOCK:
+        if key not in SCHEMA_READY:
+            setup_schema(connection)
+            if path != ":memory:":
+                SCHEMA_READY.add(key)
+    return connection
+
+
+def farm_id(connection, farm):
+    row = connection.execute("SELECT id FROM farms WHERE name = ?", (farm,)).fetchone()
+    if row is None:
+        with connection:
+            connection.execute("INSERT OR IGNORE INTO farms (name) VALUES (?)", (farm,))
+        row = connection.execute("SELECT id FROM farms WHERE name = ?", (farm,)).fetchone()
+    return row[0]
+
+
+def list_farms(connection):
+    return connection.execute("SELECT name, region FROM farms ORDER BY name").fetchall()
+
+
+def farm_region(connection, farm):
+    return connection.execute(
+        "SELECT region FROM farms WHERE id = ?", (farm_id(connection, farm),)
+    ).fetchone()[0]
+
+
+def set_farm_region(connection, farm, region):
+    farm = farm_id(connection, farm)
+    with connection:
+        connection.execute("UPDATE farms SET region = ? WHERE id = ?", (region or None, farm))
+
+
+def group_from_row(row):
+    name, animal, stage, count, days, ration, start = row
+    return {
+        "name": name,
+        "animal": animal,
+        "stage": stage,
+        "count": count,
+        "days": days,
+        "ration": json.loads(ration) if ration else None,
+        "start": start,
+    }
+
+
+def count_groups(connection, farm):
+    return connection.execute(
+        "SELECT COUNT(*) FROM farm_groups WHERE farm_id = ?", (farm_id(connection, farm),)
+    ).fetchone()[0]
+
+
+def load_groups(connection, farm, offset=0, limit=None):
+    # Groups come back in the order they were added; ``offset`` lets a caller
+    # that already holds the first groups fetch only the newer ones.
+    rows = connection.execute(
+        f"SELECT {GROUP_COLUMNS} FROM farm_groups WHERE farm_id = ? ORDER BY id LIMIT ? OFFSET ?",
+        (farm_id(connection, farm), -1 if limit is None else limit, offset),
+    )
+    return [group_from_row(row) for row in rows]
+
+
+def load_all_groups(connection):
+    # Every farm's groups in one pass, keyed by farm name, for network plans.
+    rows = connection.execute(
+        "SELECT farms.name, farm_groups.name, animal, stage, count, days, ration, start "
+        "FROM farm_groups JOIN farms ON farms.id = farm_groups.farm_id "
+        "ORDER BY farm_groups.farm_id, farm_groups.id"
+    )
+    groups = {}
+    for row in rows:
+        groups.setdefault(row[0], []).append(group_from_row(row[1:]))
+    return groups
+
+
+def changed_groups(connection, farm, seen=None):
+    # Groups only ever get added, or cleared all at once, so ``seen`` (the
+    # farm's clear counter and the last group id a caller holds) tells which
+    # groups are new. Returns the new ``seen``, the groups and whether they
+    # replace the caller's groups rather than extend them.
+    farm = farm_id(connection, farm)
+    cleared = connection.execute("SELECT groups_cleared FROM farms WHERE id = ?", (farm,)).fetchone()[0]
+    replace = seen is None or seen[0] != cleared
+    after = 0 if replace else seen[1]
+    rows = connection.execute(
+        f"SELECT id, {GROUP_COLUMNS} FROM farm_groups WHERE farm_id = ? AND id > ? ORDER BY id", (farm, after),
+    ).fetchall()
+    return (cleared, rows[-1][0] if rows else after), [group_from_row(row[1:]) for row in rows], replace
+
+
+def find_groups(connection, farm, name):
+    rows = connection.execute(
+        f"SELECT {GROUP_COLUMNS} FROM farm_groups WHERE farm_id = ? AND name = ? ORDER BY id",
+        (farm_id(connection, farm), name),
+    )
+    return [group_from_row(row) for row in rows]
+
+
+def add_groups(connection, farm, groups):
+    # All groups go in as a single transaction, so bulk loads of thousands
+    # of groups are fast and either land together or not at all.
+    farm = farm_id(connection, farm)
+    with connection:
+        connection.executemany(
+            f"INSERT INTO farm_groups (farm_id, {GROUP_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    farm, group["name"], group["animal"], group["stage"],
+                    int(group["count"]), int(group["days"]),
+                    json.dumps(group["ration"]) if group.get("ration") else None,
+                    group.get("start"),
+                )
+                for group in groups
+            ),
+        )
+
+
+def clear_groups(connection, farm):
+    farm = farm_id(connection, farm)
+    with connection:
+        connection.execute("DELETE FROM farm_groups WHERE farm_id = ?", (farm,))
+        connection.execute("UPDATE farms SET groups_cleared = groups_cleared + 1 WHERE id = ?", (farm,))
+
+
+def load_prices(connection, farm):
+    rows = connection.execute(
+        "SELECT ingredient, price FROM prices WHERE farm_id = ?", (farm_id(connection, farm),)
+    )
+    return dict(rows)
+
+
+def save_prices(connection, farm, prices):
+    farm = farm_id(connection, farm)
+    with connection:
+        connection.execute("DELETE FROM prices WHERE farm_id = ?", (farm,))
+        connection.executemany(
+            "INSERT INTO prices (farm_id, ingredient, price) VALUES (?, ?, ?)",
+            ((farm, ingredient, float(price)) for ingredient, price in prices.items()),
+        )
+
+
+def load_settings(connection, farm):
+    rows = connection.execute(
+        "SELECT key, value FROM settings WHERE farm_id = ?", (farm_id(connection, farm),)
+    )
+    return {key: json.loads(value) for key, value in rows}
+
+
+def save_settings(connection, farm, settings):
+    farm = farm_id(connection, farm)
+    with connection:
+        connection.executemany(
+            "INSERT OR REPLACE INTO settings (farm_id, key, value) VALUES (?, ?, ?)",
+            ((farm, key, json.dumps(value)) for key, value in settings.items()),
+        )
+
+
+def load_offers(connection, farm):
+    rows = connection.execute(
+        "SELECT supplier, ingredient, bag_kg, min_bags, price FROM supplier_offers WHERE farm_id = ? ORDER BY id",
+        (farm_id(connection, farm),),
+    )
+    return [
+        {"supplier": supplier, "ingredient": ingredient, "bag_kg": bag_kg, "min_bags": min_bags, "price": price}
+        for supplier, ingredient, bag_kg, min_bags, price in rows
+    ]
+
+
+def save_offers(connection, farm, offers):
+    farm = farm_id(connection, farm)
+    with connection:
+        connection.execute("DELETE FROM supplier_offers WHERE farm_id = ?", (farm,))
+        connection.executemany(
+            "INSERT INTO supplier_offers (farm_id, supplier, ingredient, bag_kg, min_bags, price) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (farm, offer["supplier"], offer["ingredient"], float(offer["bag_kg"]), int(offer["min_bags"]), float(offer["price"]))
+                for offer in offers
+            ),
+        )
+
+
+def load_stock_levels(connection, farm):
+    # Stock on hand per ingredient as of its latest event.
+    rows = connection.execute(
+        "SELECT ingredient, day, kg FROM stock_levels WHERE farm_id = ?", (farm_id(connection, farm),)
+    )
+    return {ingredient: {"day": day, "kg": kg} for ingredient, day, kg in rows}
+
+
+def load_stock_events(connection, farm, ingredient=None, since=None, limit=None):
+    # Events oldest first; with ``limit`` only the latest ones are returned.
+    query = "SELECT ingredient, day, kind, kg FROM stock_events WHERE farm_id = ?"
+    params = [farm_id(connection, farm)]
+    if ingredient is not None:
+        query += " AND ingredient = ?"
+        params.append(ingredient)
+    if since is not None:
+        query += " AND day >= ?"
+        params.append(since)
+    query += " ORDER BY day DESC, id DESC LIMIT ?"
+    params.append(-1 if limit is None else limit)
+    rows = connection.execute(query, params).fetchall()
+    return [{"ingredient": ingredient, "day": day, "kind": kind, "kg": kg} for ingredient, day, kind, kg in reversed(rows)]
+
+
+def last_stock_count(connection, farm, ingredient, day):
+    return connection.execute(
+        "SELECT MAX(day) FROM stock_events WHERE farm_id = ? AND ingredient = ? AND kind = 'count' AND day <= ?",
+        (farm_id(connection, farm), ingredient, day),
+    ).fetchone()[0]
+
+
+def save_stock_event(connection, farm, event, level):
+    # The event and the ingredient's new stock level are written together.
+    farm = farm_id(connection, farm)
+    with connection:
+        connection.execute(
+            "INSERT INTO stock_events (farm_id, ingredient, day, kind, kg) VALUES (?, ?, ?, ?, ?)",
+            (farm, event["ingredient"], event["day"], event["kind"], float(event["kg"])),
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO stock_levels (farm_id, ingredient, day, kg) VALUES (?, ?, ?, ?)",
+            (farm, event["ingredient"], level["day"], float(level["kg"])),
+        )
@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+import pytest
+
+from feed_planner import api
+
+GROUP = {"animal": "Pigs", "stage": "Grower", "count": 4, "days": 3}
+
+
+def call(method, path, body=None):
+    # Small requests never reach the worker pool, so no executor is needed.
+    if body is not None and not isinstance(body, str):
+        body = json.dumps(body)
+    return asyncio.run(api.dispatch(method, path, (body or "").encode(), None))
+
+
+def test_plan_answers_a_single_group():
+    status, payload = call("POST", "/plan", dict(GROUP, prices={"maize meal": 300}))
+    assert status == 200
+    assert payload["total_cost"] > 0
+    assert {row["Group"] for row in payload["feed"]} == {"Group 1"}
+    json.dumps(payload, allow_nan=False)
+
+
+@pytest.mark.parametrize("body, message", [
+    ("{not json", "Invalid JSON"),
+    ("[1, 2]", "JSON object"),
+    ({"groups": []}, "at least one group"),
+    ({"groups": [1]}, "JSON object"),
+    ({"groups": "all"}, "must be a list"),
+    (dict(GROUP, animal="Dragons"), "unknown animal"),
+    ('{"animal": "Pigs", "stage": "Grower", "count": 4, "ration": {"maize meal": NaN}}', "NaN"),
+    ('{"animal": "Pigs", "stage": "Grower", "count": 4, "ration": {"maize meal": Infinity}}', "Infinity"),
+    (dict(GROUP, ration={"maize meal": True}), "must be numbers"),
+    (dict(GROUP, prices={"maize meal": True}), "must be a number"),
+    (dict(GROUP, prices=[300]), "prices must be an object"),
+    (dict(GROUP, bag_size=0), "bag_size"),
+    (dict(GROUP, bag_size=-50), "bag_size"),
+])
+def test_plan_rejects_bad_requests(body, message):
+    status, payload = call("POST", "/plan", body)
+    assert status == 400
+    assert message in payload["error"]
+
+
+@pytest.mark.parametrize("change", [{"days_to_sale": 5000}, {"days_to_sale": 5}, {"count": 0}, {"forage_pct": 120}])
+def test_lifetime_cost_rejects_out_of_range_values(change):
+    status, payload = call("POST", "/lifetime-cost", dict({"animal": "Pigs", "count": 10}, **change))
+    assert status == 400, payload
+
+
+def test_lifetime_cost_uses_the_requested_days():
+    status, payload = call("POST", "/lifetime-cost", {"animal": "Pigs", "count": 10, "days_to_sale": 200})
+    assert status == 200
+    assert payload["days_to_sale"] == 200
+
+
+def test_unknown_routes_and_methods():
+    assert call("GET", "/nowhere")[0] == 404
+    assert call("GET", "/plan")[0] == 405
+    assert call("GET", "/health") == (200, {"status": "ok", "catalogue_version": api.catalogue_version()[0]})
+
+
+def test_unexpected_errors_answer_500(monkeypatch, capsys):
+    async def broken(payload, executor):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(api.ROUTES, ("POST", "/plan"), broken)
+    assert call("POST", "/plan", GROUP) == (500, {"error": "Internal error: RuntimeError"})
+    assert "boom" in capsys.readouterr().err
+
+
+def exchange(raw):
+    # Sends ``raw`` to handle_connection over a real socket and returns the
+    # status line and the JSON body of the answer.
+    async def run():
+        server = await asyncio.start_server(
+            lambda reader, writer: api.handle_connection(reader, writer, None), "127.0.0.1", 0,
+        )
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(raw)
+            await writer.drain()
+            answer = await asyncio.wait_for(reader.read(), 10)
+            writer.close()
+            return answer
+
+    head, _, body = asyncio.run(run()).partition(b"\r\n\r\n")
+    return head.split(b"\r\n")[0].decode(), json.loads(body)
+
+
+def test_connection_answers_malformed_requests():
+    assert exchange(b"GARBAGE\r\n\r\n") == ("HTTP/1.1 400 Bad Request", {"error": "Malformed request line"})
+    status, payload = exchange(b"GET /health HTTP/1.1\r\nContent-Length: x\r\n\r\n")
+    assert (status, payload) == ("HTTP/1.1 400 Bad Request", {"error": "Invalid Content-Length"})
+
+
+def test_connection_answers_a_request():
+    body = json.dumps(GROUP).encode()
+    status, payload = exchange(
+        b"POST /schedule HTTP/1.1\r\nConnection: close\r\nContent-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+    )
+    assert status == "HTTP/1.1 200 OK"
+    assert payload["schedule"]
@@ -0,0 +1,84 @@
+import io
+
+import pytest
+
+from feed_planner import group_from_record, import_groups
+from feed_planner.importer import parse_ration
+
+GROUP = {"name": "Sows", "animal": "Pigs", "stage": "Grower", "count": "12", "days": "30"}
+
+
+def test_group_from_record_reads_a_row():
+    group = group_from_record(dict(GROUP, ration='{"maize meal": 60, "soybean meal": 40}', start="2024-03-01"), 1)
+    assert group == {
+        "name": "Sows",
+        "animal": "Pigs",
+        "stage": "Grower",
+        "count": 12,
+        "days": 30,
+        "ration": {"maize meal": 60.0, "soybean meal": 40.0},
+        "start": "2024-03-01",
+    }
+
+
+def test_group_from_record_fills_defaults():
+    group = group_from_record(dict(GROUP, name="", days=""), 7, default_days=14)
+    assert (group["name"], group["days"], group["ration"], group["start"]) == ("Group 7", 14, None, None)
+
+
+@pytest.mark.parametrize("change, message", [
+    ({"animal": "Dragons"}, "unknown animal"),
+    ({"stage": "Flying"}, "unknown stage"),
+    ({"count": "many"}, "count must be a number"),
+    ({"count": "2.5"}, "whole number"),
+    ({"count": "0"}, "whole number"),
+    ({"count": "nan"}, "whole number"),
+    ({"days": "-3"}, "whole number"),
+    ({"ration": "{corn"}, "not valid JSON"),
+    ({"ration": "[1, 2]"}, "JSON object"),
+    ({"ration": '{"gold dust": 10}'}, "unknown ingredient"),
+    ({"ration": '{"maize meal": "lots"}'}, "must be numbers"),
+    ({"ration": '{"maize meal": 0}'}, "add up to more than 0"),
+    ({"ration": '{"maize meal": NaN}'}, "finite"),
+    ({"start": "next week"}, "start must be a date"),
+])
+def test_group_from_record_rejects_bad_rows(change, message):
+    with pytest.raises(ValueError, match=message):
+        group_from_record(dict(GROUP, **change), 1)
+
+
+@pytest.mark.parametrize("ration", [{"maize meal": True}, {"maize meal": float("inf")}, {"maize meal": -5, "premix": 10}])
+def test_parse_ration_rejects_non_numeric_shares(ration):
+    with pytest.raises(ValueError):
+        parse_ration(ration)
+
+
+def test_import_groups_reports_rows_and_skips_blank_lines():
+    text = (
+        "Name,Animal,Stage,Count,Days\n"
+        "A,Pigs,Grower,5,30\n"
+        "\n"
+        ",,,,\n"
+        "B,Pigs,Grower,x,30\n"
+        "C,Dragons,Hatchling,4,30\n"
+        "D,Pigs,Grower,4,\n"
+    )
+    added = []
+    result = import_groups(io.StringIO(text), added.extend, chunk_size=2, file_name="groups.csv")
+    assert result["imported"] == 2
+    assert [group["name"] for group in added] == ["A", "D"]
+    assert result["error_count"] == 2
+    assert result["errors"][["Row", "Name"]].values.tolist() == [[5, "B"], [6, "C"]]
+
+
+def test_import_groups_reads_excel(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in (["name", "animal", "stage", "count", "days"], ["A", "Pigs", "Grower", 5, 30], [None] * 5, ["B", "Pigs", "Grower", 6, 30]):
+        sheet.append(row)
+    workbook.save(tmp_path / "groups.xlsx")
+    added = []
+    result = import_groups(tmp_path / "groups.xlsx", added.extend)
+    assert (result["imported"], result["error_count"]) == (2, 0)
+    assert [group["count"] for group in added] == [5, 6]
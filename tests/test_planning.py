@@ -0,0 +1,92 @@
+import math
+import random
+
+import pandas as pd
+import pytest
+
+from feed_planner import (
+    CUSTOM_INGREDIENTS,
+    LIVESTOCK_DATA,
+    add_costs,
+    build_farm_plan,
+    calculate_group_plan,
+    concat_plan_frames,
+)
+from feed_planner.planning import farm_plan_rows, group_schedule_rows
+
+PRICES = {ingredient: 200.0 + 25 * number for number, ingredient in enumerate(CUSTOM_INGREDIENTS)}
+BAG_SIZE = 50.0
+
+
+def random_groups(rng, size):
+    groups = []
+    for number in range(size):
+        animal = rng.choice(list(LIVESTOCK_DATA))
+        stage = rng.choice(list(LIVESTOCK_DATA[animal]["stages"]))
+        ration = None
+        if rng.random() < 0.3:
+            ration = {ingredient: rng.randint(1, 60) for ingredient in rng.sample(CUSTOM_INGREDIENTS, rng.randint(1, 5))}
+        groups.append({
+            "name": f"Group {number % 7}",
+            "animal": animal,
+            "stage": stage,
+            "count": rng.randint(1, 500),
+            "days": rng.randint(1, 120),
+            "ration": ration,
+        })
+    return groups
+
+
+def same_rows(rows, expected):
+    assert len(rows) == len(expected)
+    for row, other in zip(rows, expected):
+        assert row.keys() == other.keys()
+        for column, value in row.items():
+            if isinstance(value, str) or isinstance(other[column], str):
+                assert value == other[column], column
+            else:
+                assert math.isclose(value, other[column], rel_tol=1e-9, abs_tol=1e-9), column
+
+
+def by_group_and_ingredient(feed):
+    return feed.sort_values(["Group", "Ingredient"], kind="stable").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_farm_plan_matches_group_plans(seed):
+    groups = random_groups(random.Random(seed), 30)
+    for number, group in enumerate(groups):
+        group["name"] = f"Group {number}"
+    plan = build_farm_plan(groups, PRICES, BAG_SIZE)
+    per_group = concat_plan_frames([
+        add_costs(
+            calculate_group_plan(group["name"], group["animal"], group["stage"], group["count"], group["days"], group["ration"]),
+            PRICES, BAG_SIZE,
+        )
+        for group in groups
+    ])
+    assert dict(per_group.dtypes) == dict(plan["feed"].dtypes)
+    pd.testing.assert_frame_equal(by_group_and_ingredient(per_group), by_group_and_ingredient(plan["feed"]))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_plan_rows_match_dataframe_plan(seed):
+    rng = random.Random(seed)
+    groups = random_groups(rng, rng.randint(1, 25))
+    prices = {ingredient: rng.choice([0.0, rng.uniform(50, 900)]) for ingredient in CUSTOM_INGREDIENTS}
+    bag_size = rng.choice([25.0, 50.0, 70.0])
+    plan = build_farm_plan(groups, prices, bag_size)
+    feed, summary = farm_plan_rows(groups, prices, bag_size)
+    same_rows(feed, plan["feed"].to_dict("records"))
+    same_rows(summary, plan["summary"].to_dict("records"))
+    same_rows([row for group in groups for row in group_schedule_rows(group)], plan["schedule"].to_dict("records"))
+
+
+def test_concat_plan_frames_keeps_dtypes_of_one_pass():
+    groups = random_groups(random.Random(1), 12)
+    plan = build_farm_plan(groups, PRICES, BAG_SIZE)
+    parts = [build_farm_plan(groups[:5], PRICES, BAG_SIZE), build_farm_plan(groups[5:], PRICES, BAG_SIZE)]
+    for name in ("feed", "schedule", "groups"):
+        joined = concat_plan_frames([part[name] for part in parts])
+        assert dict(joined.dtypes) == dict(plan[name].dtypes), name
+        assert len(joined) == len(plan[name])
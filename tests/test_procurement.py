@@ -0,0 +1,76 @@
+import itertools
+import math
+import random
+
+import pytest
+
+from feed_planner import CUSTOM_INGREDIENTS
+from feed_planner.procurement import GRAMS_PER_STEP, cheapest_purchase, offer_breaks, procurement_plan
+
+
+def order_cost(bags, breaks):
+    # All-units breaks: every bag costs the price of the largest break reached.
+    if bags == 0:
+        return 0.0
+    prices = [price for min_bags, price in breaks if bags >= min_bags]
+    return bags * min(prices) if prices else math.inf
+
+
+def brute_force(kg, offers):
+    # Any cheapest order buys fewer than one spare bag beyond the need or the
+    # largest minimum order, so these ranges hold an optimum.
+    ranges = [
+        range(int(kg // bag_kg) + 2 + max(min_bags for min_bags, _ in breaks))
+        for _, bag_kg, breaks in offers
+    ]
+    best = math.inf
+    for combination in itertools.product(*ranges):
+        if sum(bags * bag_kg for bags, (_, bag_kg, _) in zip(combination, offers)) * 1000 + 1e-6 < kg * 1000:
+            continue
+        best = min(best, sum(order_cost(bags, breaks) for bags, (_, _, breaks) in zip(combination, offers)))
+    return best
+
+
+def random_offers(rng, ingredient):
+    offers = []
+    for supplier in range(rng.randint(1, 3)):
+        bag_kg = rng.choice([10, 12.5, 25, 40, 50, 70])
+        for _ in range(rng.randint(1, 3)):
+            offers.append({
+                "supplier": f"Supplier {supplier}",
+                "ingredient": ingredient,
+                "bag_kg": bag_kg,
+                "min_bags": rng.randint(1, 4),
+                "price": rng.choice([0.0, rng.uniform(50, 400), rng.uniform(50, 400)]),
+            })
+    return offers
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_order_matches_brute_force(seed):
+    rng = random.Random(seed)
+    ingredients = rng.sample(CUSTOM_INGREDIENTS, rng.randint(1, 3))
+    offers = [offer for ingredient in ingredients for offer in random_offers(rng, ingredient)]
+    needs = {ingredient: round(rng.uniform(0, 250), 1) for ingredient in ingredients}
+    breaks = offer_breaks(offers)
+    plan = procurement_plan(needs, offers)
+    assert plan["missing"] == [ingredient for ingredient, kg in needs.items() if kg > 0 and ingredient not in breaks]
+    for ingredient, kg in needs.items():
+        if kg <= 0 or ingredient not in breaks:
+            continue
+        offered = {(supplier, bag_kg): kept for supplier, bag_kg, kept in breaks[ingredient]}
+        rows = plan["orders"][plan["orders"]["Ingredient"] == ingredient].to_dict("records")
+        assert sum(row["Kg bought"] for row in rows) * 1000 + GRAMS_PER_STEP / 2 >= kg * 1000
+        for row in rows:
+            assert math.isclose(row["Cost"], order_cost(row["Bags"], offered[(row["Supplier"], row["Bag kg"])]), rel_tol=1e-9)
+        cost = sum(row["Cost"] for row in rows)
+        assert math.isclose(cost, brute_force(kg, breaks[ingredient]), rel_tol=1e-9, abs_tol=1e-6)
+
+
+def test_bulk_break_beats_smaller_bags():
+    offers = [("A", 25.0, [(1, 260.0)]), ("B", 50.0, [(4, 480.0)])]
+    assert cheapest_purchase(180, offers) == [("B", 50.0, 4, 480.0)]
+
+
+def test_nothing_needed_buys_nothing():
+    assert cheapest_purchase(0, [("A", 25.0, [(1, 260.0)])]) == []
@@ -0,0 +1,80 @@
+import sqlite3
+
+import pytest
+
+from feed_planner import storage
+
+
+def group(name, count=5):
+    return {"name": name, "animal": "Pigs", "stage": "Grower", "count": count, "days": 30}
+
+
+@pytest.fixture
+def connections(tmp_path):
+    path = str(tmp_path / "farm.sqlite3")
+    this, other = storage.connect(path), storage.connect(path)
+    yield this, other
+    this.close()
+    other.close()
+
+
+def names(groups):
+    return [group["name"] for group in groups]
+
+
+def test_changed_groups_appends_new_groups(connections):
+    this, other = connections
+    seen, groups, replace = storage.changed_groups(this, "Farm")
+    assert (groups, replace) == ([], True)
+
+    storage.add_groups(other, "Farm", [group("A"), group("B")])
+    seen, groups, replace = storage.changed_groups(this, "Farm", seen)
+    assert (names(groups), replace) == (["A", "B"], False)
+
+    storage.add_groups(other, "Farm", [group("C")])
+    seen, groups, replace = storage.changed_groups(this, "Farm", seen)
+    assert (names(groups), replace) == (["C"], False)
+
+    assert storage.changed_groups(this, "Farm", seen) == (seen, [], False)
+
+
+def test_changed_groups_replaces_after_a_clear(connections):
+    this, other = connections
+    storage.add_groups(other, "Farm", [group("A"), group("B")])
+    seen, groups, _ = storage.changed_groups(this, "Farm")
+    assert names(groups) == ["A", "B"]
+
+    # The same number of groups again, reusing the cleared groups' ids.
+    storage.clear_groups(other, "Farm")
+    storage.add_groups(other, "Farm", [group("C"), group("D")])
+    seen, groups, replace = storage.changed_groups(this, "Farm", seen)
+    assert (names(groups), replace) == (["C", "D"], True)
+
+    storage.clear_groups(other, "Farm")
+    _, groups, replace = storage.changed_groups(this, "Farm", seen)
+    assert (groups, replace) == ([], True)
+
+
+def test_farms_are_tracked_separately(connections):
+    this, other = connections
+    seen, _, _ = storage.changed_groups(this, "Farm")
+    storage.add_groups(other, "Other farm", [group("X")])
+    storage.clear_groups(other, "Other farm")
+    assert storage.changed_groups(this, "Farm", seen) == (seen, [], False)
+
+
+def test_connect_migrates_an_old_database(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    old = sqlite3.connect(path)
+    old.executescript(
+        "CREATE TABLE farms (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);"
+        "INSERT INTO farms (name) VALUES ('Farm');"
+    )
+    old.commit()
+    old.close()
+    connection = storage.connect(path)
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(farms)")}
+    assert {"region", "groups_cleared"} <= columns
+    storage.add_groups(connection, "Farm", [group("A")])
+    assert names(storage.changed_groups(connection, "Farm")[1]) == ["A"]
+    connection.close()